@@ -0,0 +1,337 @@
+'''
+Benchmarks.
+
+    python benchmarks/bench.py                          # run all the cases
+    python benchmarks/bench.py -k uri                   # run matching cases
+    python benchmarks/bench.py --save baselines/x.json  # store a baseline
+    python benchmarks/bench.py --compare baselines/x.json --threshold 0.2
+
+Results are seconds per operation: the median of `--repeat` runs in each
+of `--processes` fresh processes, and then the median of the processes
+(medians are less sensitive to outliers than the best or the mean).
+Compare mode exits with status 1 if any case is slower than the baseline
+by more than the threshold. Baselines are only comparable on the same
+machine, and are best saved with more processes (e.g. `--processes 9`),
+since their noise adds to that of every comparison.
+'''
+from typing import Any, Callable, Dict, List, Optional
+from argparse import ArgumentParser
+from statistics import median
+from pathlib import Path
+import subprocess
+import platform
+import timeit
+import json
+import sys
+import os
+
+BASEDIR = Path(__file__).parent
+
+sys.path.insert(0, str(BASEDIR.parent / 'src'))
+
+from corpora import load  # noqa: E402
+
+#: default max slowdown ratio. Run to run noise of the medians is up to
+#: ~15% on shared machines.
+THRESHOLD = 0.3
+
+#: case name -> function that returns seconds per operation
+CASES = dict()  # type: Dict[str, Callable[[int], float]]
+
+
+def case(name: str) -> Callable:
+    def register(func: Callable[[int], float]) -> Callable[[int], float]:
+        CASES[name] = func
+        return func
+    return register
+
+
+def measure(func: Callable[[], None], count: int, repeat: int) -> float:
+    '''Returns the median time per operation of `func`, that does
+    `count` operations.
+    '''
+    func()  # warm up
+    return median(timeit.repeat(func, number=1, repeat=repeat)) / count
+
+
+def parse_all(parse: Callable, values: List[str]) -> Callable[[], None]:
+    def run() -> None:
+        for v in values:
+            try:
+                parse(v)
+            except ValueError:
+                pass
+    return run
+
+
+# import
+
+IMPORT = '''\
+from time import perf_counter
+start = perf_counter()
+import pydentic.strings
+print(perf_counter() - start)
+'''
+
+
+@case('import.strings')
+def bench_import(repeat: int) -> float:
+    cmd = [sys.executable, '-c', IMPORT]
+    env = dict(os.environ, PYTHONPATH=sys.path[0])
+    return median(float(subprocess.run(cmd, env=env, check=True,
+                                       capture_output=True).stdout)
+                  for _ in range(repeat))
+
+
+# stdnum
+
+STDNUM = {
+    'iban':   ('Iban', None),
+    'isbn':   ('Isbn', None),
+    'ean':    ('Ean', None),
+    'imei':   ('Imei', None),
+    'es.nif': ('Nif', 'es'),
+}
+
+
+def stdnum_case(corpus: str, invalid: bool) -> Callable[[int], float]:
+    def bench(repeat: int) -> float:
+        from importlib import import_module
+
+        name, package = STDNUM[corpus]
+        module = 'pydentic.strings' + (f'.{package}' if package else '')
+        cls = getattr(import_module(module), name)
+        values = load(corpus, invalid)
+        return measure(parse_all(cls.parse, values), len(values), repeat)
+    return bench
+
+
+for _corpus in STDNUM:
+    case(f'stdnum.{_corpus}.valid')(stdnum_case(_corpus, False))
+    case(f'stdnum.{_corpus}.invalid')(stdnum_case(_corpus, True))
+
+
+# URIs
+
+def uri_case(corpus: str, name: str) -> Callable[[int], float]:
+    def bench(repeat: int) -> float:
+        from pydentic.strings import uri
+
+        values = load(corpus)
+        return measure(parse_all(getattr(uri, name), values),
+                       len(values), repeat)
+    return bench
+
+
+case('uri.geo')(uri_case('geo', 'GeoUri'))
+case('uri.websocket')(uri_case('websocket', 'WebSocketUri'))
+case('uri.stun')(uri_case('stun', 'StunUri'))
+
+
+# MIME
+
+# the corpora fit in the cache, so `from_str` cases time cache hits and
+# `parse` cases time the parser itself
+
+@case('mime.content_type')
+def bench_content_type(repeat: int) -> float:
+    from pydentic.strings.mime import ContentType
+
+    values = load('content_type')
+    return measure(parse_all(ContentType.from_str, values),
+                   len(values), repeat)
+
+
+@case('mime.content_type.parse')
+def bench_content_type_parse(repeat: int) -> float:
+    from pydentic.strings.mime import ContentType
+
+    values = load('content_type')
+    return measure(parse_all(ContentType._parse, values),
+                   len(values), repeat)
+
+
+@case('mime.accept.parse')
+def bench_accept_parse(repeat: int) -> float:
+    from pydentic.strings.mime import Accept
+
+    values = load('accept')
+    return measure(parse_all(Accept._parse, values), len(values), repeat)
+
+
+@case('mime.negotiate')
+def bench_negotiate(repeat: int) -> float:
+    from pydentic.strings.mime import Negotiator
+
+    negotiator = Negotiator(['application/json', 'text/html',
+                             'application/vnd.api+json'])
+    values = load('accept')
+    return measure(parse_all(negotiator.best_match, values),
+                   len(values), repeat)
+
+
+# JSON Schema
+
+@case('schema.stdnum')
+def bench_schema_stdnum(repeat: int) -> float:
+    from types import ModuleType
+
+    import pydentic.strings as strings
+    from pydentic.strings.base import Stdnum
+    from pydentic.strings.registry import is_package
+
+    def stdnum_types(module: ModuleType) -> List[type]:
+        types = [getattr(module, n) for n in dir(module)]
+        return [t for t in types
+                if isinstance(t, type) and issubclass(t, Stdnum)
+                and t is not Stdnum]
+
+    types = stdnum_types(strings)
+    for name, entry in strings.FORMATS.items():
+        if is_package(entry):
+            types.extend(stdnum_types(getattr(strings, name)))
+
+    def run() -> None:
+        for cls in types:
+            cls.__modify_schema__({})
+
+    return measure(run, len(types), repeat)
+
+
+@case('schema.model')
+def bench_schema_model(repeat: int) -> Optional[float]:
+    try:
+        from pydantic.v1 import BaseModel
+    except ImportError:
+        try:
+            from pydantic import BaseModel
+        except ImportError:
+            return None
+
+    from pydentic.strings import Ean, Iban, Imei, Isbn
+    from pydentic.strings.es import Nif
+
+    class Model(BaseModel):
+        iban: Iban
+        isbn: Isbn
+        ean:  Ean
+        imei: Imei
+        nif:  Nif
+
+    def run() -> None:
+        Model.__schema_cache__.clear()
+        Model.schema()
+
+    return measure(run, 1, repeat)
+
+
+def run_cases(pattern: Optional[str], repeat: int) -> Dict[str, Any]:
+    '''Returns the results of the matching cases (`None` if skipped).
+    '''
+    return {name: bench(repeat) for name, bench in CASES.items()
+            if not pattern or pattern in name}
+
+
+def run(
+    pattern:   Optional[str],
+    repeat:    int,
+    processes: int,
+) -> Dict[str, float]:
+    '''Runs the cases in each of `processes` fresh processes, and returns
+    the median of their results: timings vary between processes (memory
+    layout, hash seeds) more than between runs of a process.
+    '''
+    if processes <= 1:
+        rounds = [run_cases(pattern, repeat)]
+    else:
+        cmd = [sys.executable, __file__, '--repeat', str(repeat),
+               '--processes', '1', '--json']
+        if pattern:
+            cmd += ['-k', pattern]
+        rounds = [json.loads(subprocess.run(cmd, check=True,
+                                            capture_output=True).stdout)
+                  for _ in range(processes)]
+
+    results = dict()
+    for name in rounds[0]:
+        values = [r[name] for r in rounds if r.get(name) is not None]
+        if not values:
+            print(f'{name:<28} skipped')
+            continue
+        results[name] = median(values)
+        print(f'{name:<28} {results[name] * 1e6:12.3f} us')
+    return results
+
+
+def metadata() -> Dict[str, str]:
+    import stdnum
+    import pydentic
+
+    return dict(python=platform.python_version(),
+                implementation=platform.python_implementation(),
+                machine=platform.machine(),
+                pydentic='.'.join(map(str, pydentic.__version__)),
+                stdnum=stdnum.__version__)
+
+
+def compare(
+    results:   Dict[str, float],
+    baseline:  Dict[str, float],
+    threshold: float,
+) -> List[str]:
+    '''Returns the cases slower than the baseline by more than the
+    threshold (a ratio, e.g. `0.2` for 20%).
+    '''
+    print(f'\n{"case":<28} {"baseline":>12} {"current":>12} {"change":>8}')
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        change = result / baseline[name] - 1
+        flag = ''
+        if change > threshold:
+            regressions.append(name)
+            flag = '  REGRESSION'
+        print(f'{name:<28} {baseline[name] * 1e6:10.3f}us '
+              f'{result * 1e6:10.3f}us {change:+8.1%}{flag}')
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = ArgumentParser(description='pydentic benchmarks')
+    parser.add_argument('-k', dest='pattern',
+                        help='only run cases containing this string')
+    parser.add_argument('--repeat', type=int, default=9,
+                        help='runs per case (default: %(default)s)')
+    parser.add_argument('--processes', type=int, default=3,
+                        help='fresh processes per case (default: %(default)s)')
+    parser.add_argument('--json', action='store_true',
+                        help='print the results as JSON (and nothing else)')
+    parser.add_argument('--save', type=Path, help='store results as JSON')
+    parser.add_argument('--compare', type=Path, help='JSON baseline')
+    parser.add_argument('--threshold', type=float, default=THRESHOLD,
+                        help='max slowdown ratio (default: %(default)s)')
+    args = parser.parse_args(argv)
+
+    if args.json:
+        print(json.dumps(run_cases(args.pattern, args.repeat)))
+        return 0
+
+    results = run(args.pattern, args.repeat, args.processes)
+
+    if args.save:
+        data = dict(meta=metadata(), results=results)
+        args.save.write_text(json.dumps(data, indent=2) + '\n')
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text())['results']
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f'\n{len(regressions)} regression(s): '
+                  + ', '.join(regressions))
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,172 @@
+'''
+Generates the benchmark corpora in `corpora/`.
+
+    python benchmarks/corpora.py
+
+Corpora are generated with a fixed seed and committed, so benchmark runs
+don't depend on the generator (or python-stdnum) version.
+'''
+from typing import Callable, List
+from pathlib import Path
+import random
+
+from stdnum import ean, iban, luhn
+from stdnum.es import dni
+
+CORPORA = Path(__file__).with_name('corpora')
+
+SIZE = 2000
+
+SEED = 20211018
+
+Generator = Callable[[random.Random], str]
+
+
+def digits(rnd: random.Random, count: int) -> str:
+    return ''.join(rnd.choice('0123456789') for _ in range(count))
+
+
+def gen_iban(rnd: random.Random) -> str:
+    bban = digits(rnd, 18)
+    number = 'DE' + iban.calc_check_digits('DE00' + bban) + bban
+    return iban.format(number) if rnd.random() < .5 else number.lower()
+
+
+def gen_isbn(rnd: random.Random) -> str:
+    number = '978' + digits(rnd, 9)
+    number += ean.calc_check_digit(number)
+    return '-'.join((number[:3], number[3], number[4:7], number[7:12],
+                     number[12]))
+
+
+def gen_ean(rnd: random.Random) -> str:
+    number = digits(rnd, 12)
+    return number + ean.calc_check_digit(number)
+
+
+def gen_imei(rnd: random.Random) -> str:
+    number = digits(rnd, 14)
+    return number + luhn.calc_check_digit(number)
+
+
+def gen_nif(rnd: random.Random) -> str:
+    number = digits(rnd, 8)
+    return number + dni.calc_check_digit(number)
+
+
+def gen_geo(rnd: random.Random) -> str:
+    uri = f'geo:{rnd.uniform(-90, 90):.4f},{rnd.uniform(-180, 180):.4f}'
+    if rnd.random() < .5:
+        uri += f',{rnd.randrange(2000)}'
+    if rnd.random() < .3:
+        uri += f';u={rnd.randrange(100)}'
+    return uri
+
+
+def host(rnd: random.Random) -> str:
+    labels = [''.join(rnd.choice('abcdefghijklmnopqrstuvwxyz')
+                      for _ in range(rnd.randrange(3, 10)))
+              for _ in range(rnd.randrange(2, 4))]
+    return '.'.join(labels)
+
+
+def gen_websocket(rnd: random.Random) -> str:
+    uri = f'{rnd.choice(("ws", "wss"))}://{host(rnd)}'
+    if rnd.random() < .3:
+        uri += f':{rnd.randrange(1024, 65536)}'
+    uri += '/' + '/'.join(host(rnd).split('.'))
+    if rnd.random() < .5:
+        uri += f'?token={digits(rnd, 8)}'
+    return uri
+
+
+def gen_stun(rnd: random.Random) -> str:
+    uri = f'{rnd.choice(("stun", "stuns"))}:{host(rnd)}'
+    if rnd.random() < .5:
+        uri += f':{rnd.randrange(1024, 65536)}'
+    return uri
+
+
+CTYPES = ('text/html', 'text/plain', 'application/json',
+          'application/ld+json', 'image/png', 'multipart/form-data',
+          'application/x-www-form-urlencoded', 'application/vnd.api+json')
+
+
+def gen_content_type(rnd: random.Random) -> str:
+    ctype = rnd.choice(CTYPES)
+    if ctype.startswith('text/') or rnd.random() < .3:
+        ctype += '; charset=' + rnd.choice(('utf-8', 'UTF-8', 'iso-8859-1'))
+    if ctype.startswith('multipart/'):
+        ctype += '; boundary=' + digits(rnd, 24)
+    return ctype
+
+
+ACCEPTS = ('*/*', 'application/json', 'application/json, text/plain, */*',
+           'text/html,application/xhtml+xml,application/xml;q=0.9,'
+           'image/avif,image/webp,*/*;q=0.8',
+           'application/vnd.api+json', 'text/*;q=0.5, application/*+json')
+
+
+def gen_accept(rnd: random.Random) -> str:
+    # a few clients send most of the headers
+    if rnd.random() < .9:
+        return rnd.choice(ACCEPTS)
+    ranges = rnd.sample(CTYPES, rnd.randint(1, 4))
+    return ', '.join(f'{r};q=0.{rnd.randint(1, 9)}' for r in ranges)
+
+
+def corrupt(rnd: random.Random, value: str) -> str:
+    '''Changes a character (mostly checksum errors), or the length.
+    '''
+    i = rnd.randrange(len(value))
+    op = rnd.random()
+    if op < .7:
+        return value[:i] + rnd.choice('0123456789') + value[i + 1:]
+    if op < .85:
+        return value[:i] + value[i + 1:]
+    return value[:i] + rnd.choice('0123456789X') + value[i:]
+
+
+GENERATORS = {
+    'iban':         gen_iban,
+    'isbn':         gen_isbn,
+    'ean':          gen_ean,
+    'imei':         gen_imei,
+    'es.nif':       gen_nif,
+    'geo':          gen_geo,
+    'websocket':    gen_websocket,
+    'stun':         gen_stun,
+    'content_type': gen_content_type,
+    'accept':       gen_accept,
+}
+
+#: corpora with corrupted (mostly invalid) values too
+INVALID = ('iban', 'isbn', 'ean', 'imei', 'es.nif')
+
+
+def generate(name: str, invalid: bool = False) -> List[str]:
+    rnd = random.Random(f'{SEED}:{name}:{invalid}')
+    values = [GENERATORS[name](rnd) for _ in range(SIZE)]
+    if invalid:
+        values = [corrupt(rnd, v) for v in values]
+    return values
+
+
+def load(name: str, invalid: bool = False) -> List[str]:
+    suffix = '.invalid' if invalid else ''
+    path = CORPORA / f'{name}{suffix}.txt'
+    return path.read_text('utf-8').splitlines()
+
+
+def main() -> None:
+    CORPORA.mkdir(exist_ok=True)
+    for name in GENERATORS:
+        for invalid in (False, True) if name in INVALID else (False,):
+            suffix = '.invalid' if invalid else ''
+            path = CORPORA / f'{name}{suffix}.txt'
+            path.write_text('\n'.join(generate(name, invalid)) + '\n',
+                            'utf-8')
+
+
+if __name__ == '__main__':
+    main()
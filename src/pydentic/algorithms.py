@@ -0,0 +1,247 @@
+'''
+Vectorized checksum algorithms (requires NumPy).
+
+Numbers are fixed-width 2D arrays with a number per row and a character
+value per column (see `to_array`). Results are 1D arrays, one item per
+number.
+
+    >>> luhn_checksum(to_array(['79927398713', '79927398710']))
+    array([0, 7])
+'''
+from typing import Callable, List, NamedTuple, Optional, Pattern, Sequence
+from types import ModuleType
+import re
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+DIGITS = '0123456789'
+
+BASE36 = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+
+
+def to_array(numbers: Sequence[str], alphabet: str = DIGITS) -> 'np.ndarray':
+    '''Converts same-length numbers to an array of character values
+    (their index in the alphabet).
+    '''
+    table = np.full(256, 255, dtype=np.uint8)
+    table[np.frombuffer(alphabet.encode('ascii'), dtype=np.uint8)] = \
+        np.arange(len(alphabet), dtype=np.uint8)
+
+    data = ''.join(numbers).encode('ascii')
+    width = len(numbers[0]) if numbers else 0
+    if len(data) != width * len(numbers):
+        raise ValueError('numbers must have the same length')
+
+    values = table[np.frombuffer(data, dtype=np.uint8)]
+    if (values == 255).any():
+        raise ValueError('numbers must only contain alphabet characters')
+    return values.reshape(len(numbers), width)
+
+
+def _append(values: 'np.ndarray', *digits: int) -> 'np.ndarray':
+    extra = np.broadcast_to(np.array(digits, dtype=values.dtype),
+                            (len(values), len(digits)))
+    return np.hstack((values, extra))
+
+
+# Luhn
+
+def luhn_checksum(values: 'np.ndarray') -> 'np.ndarray':
+    '''Luhn checksum of decimal numbers. Valid numbers have a checksum
+    of 0.
+    '''
+    values = values[:, ::-1].astype(np.int32)
+    doubled = values[:, 1::2] * 2
+    doubled -= 9 * (doubled > 9)
+    return (values[:, ::2].sum(axis=1) + doubled.sum(axis=1)) % 10
+
+
+def luhn_calc_check_digit(values: 'np.ndarray') -> 'np.ndarray':
+    return (10 - luhn_checksum(_append(values, 0))) % 10
+
+
+# ISO 7064 Mod 97, 10
+
+def mod_97_10_checksum(values: 'np.ndarray') -> 'np.ndarray':
+    '''ISO 7064 Mod 97, 10 checksum of alphanumeric (base 36) numbers.
+    Letters count as two digits (A = 10). Valid numbers have a checksum
+    of 1.
+    '''
+    values = values.astype(np.int32)
+    result = np.zeros(len(values), dtype=np.int32)
+    for column in values.T:
+        scale = np.where(column < 10, 10, 100)
+        result = (result * scale + column) % 97
+    return result
+
+
+def mod_97_10_calc_check_digits(values: 'np.ndarray') -> 'np.ndarray':
+    return 98 - mod_97_10_checksum(_append(values, 0, 0))
+
+
+# Verhoeff
+
+VERHOEFF_MULTIPLICATION = (
+    (0, 1, 2, 3, 4, 5, 6, 7, 8, 9),
+    (1, 2, 3, 4, 0, 6, 7, 8, 9, 5),
+    (2, 3, 4, 0, 1, 7, 8, 9, 5, 6),
+    (3, 4, 0, 1, 2, 8, 9, 5, 6, 7),
+    (4, 0, 1, 2, 3, 9, 5, 6, 7, 8),
+    (5, 9, 8, 7, 6, 0, 4, 3, 2, 1),
+    (6, 5, 9, 8, 7, 1, 0, 4, 3, 2),
+    (7, 6, 5, 9, 8, 2, 1, 0, 4, 3),
+    (8, 7, 6, 5, 9, 3, 2, 1, 0, 4),
+    (9, 8, 7, 6, 5, 4, 3, 2, 1, 0))
+
+VERHOEFF_PERMUTATION = (
+    (0, 1, 2, 3, 4, 5, 6, 7, 8, 9),
+    (1, 5, 7, 6, 2, 8, 3, 0, 9, 4),
+    (5, 8, 0, 3, 7, 9, 6, 1, 4, 2),
+    (8, 9, 1, 6, 0, 4, 3, 5, 2, 7),
+    (9, 4, 5, 3, 1, 2, 6, 8, 7, 0),
+    (4, 2, 8, 6, 5, 7, 3, 9, 0, 1),
+    (2, 7, 9, 3, 8, 0, 6, 4, 1, 5),
+    (7, 0, 4, 6, 9, 1, 3, 2, 5, 8))
+
+
+def verhoeff_checksum(values: 'np.ndarray') -> 'np.ndarray':
+    '''Verhoeff checksum of decimal numbers. Valid numbers have a
+    checksum of 0.
+    '''
+    mul = np.array(VERHOEFF_MULTIPLICATION, dtype=np.uint8)
+    perm = np.array(VERHOEFF_PERMUTATION, dtype=np.uint8)
+    result = np.zeros(len(values), dtype=np.uint8)
+    for i, column in enumerate(values[:, ::-1].T):
+        result = mul[result, perm[i % 8, column]]
+    return result
+
+
+def verhoeff_calc_check_digit(values: 'np.ndarray') -> 'np.ndarray':
+    inverse = np.argmin(np.array(VERHOEFF_MULTIPLICATION), axis=1)
+    return inverse[verhoeff_checksum(_append(values, 0))]
+
+
+# Damm
+
+DAMM_OPERATION = (
+    (0, 3, 1, 7, 5, 9, 8, 6, 4, 2),
+    (7, 0, 9, 2, 1, 5, 4, 8, 6, 3),
+    (4, 2, 0, 6, 8, 7, 1, 3, 5, 9),
+    (1, 7, 5, 0, 9, 8, 3, 4, 2, 6),
+    (6, 1, 2, 3, 0, 4, 5, 9, 7, 8),
+    (3, 6, 7, 4, 2, 0, 9, 5, 8, 1),
+    (5, 8, 6, 9, 7, 2, 0, 1, 3, 4),
+    (8, 9, 4, 5, 3, 6, 2, 0, 1, 7),
+    (9, 4, 3, 8, 6, 1, 7, 2, 0, 5),
+    (2, 5, 8, 1, 4, 3, 6, 7, 9, 0))
+
+
+def damm_checksum(values: 'np.ndarray') -> 'np.ndarray':
+    '''Damm checksum of decimal numbers. Valid numbers have a checksum
+    of 0.
+    '''
+    table = np.array(DAMM_OPERATION, dtype=np.uint8)
+    result = np.zeros(len(values), dtype=np.uint8)
+    for column in values.T:
+        result = table[result, column]
+    return result
+
+
+def damm_calc_check_digit(values: 'np.ndarray') -> 'np.ndarray':
+    return damm_checksum(values)
+
+
+# stdnum batch validation
+
+class Kernel(NamedTuple):
+    '''Checksum of a stdnum format.
+
+    Attributes:
+        pattern: compact numbers that `validate` checks the checksum of
+            (any earlier check passes).
+        checksum: vectorized checksum.
+        valid: checksum of valid numbers.
+        alphabet: characters of the numbers.
+        prepare: rearranges compact numbers before the checksum.
+        accept: other checks `validate` does before the checksum.
+    '''
+    pattern:  Pattern
+    checksum: Callable
+    valid:    int = 0
+    alphabet: str = DIGITS
+    prepare:  Callable[[str], str] = str
+    accept:   Callable[[str], bool] = bool
+
+
+def _accept_aadhaar(number: str) -> bool:
+    # Aadhaar can't be a palindrome
+    return number != number[::-1]
+
+
+def _checked(
+    kernel:  Kernel,
+    compact: Callable[[str], str],
+    number:  str,
+) -> Optional[str]:
+    '''Returns the number prepared for the checksum, or `None` if
+    `validate` rejects it before the checksum.
+    '''
+    try:
+        # numbers matching the pattern are already compact
+        if not kernel.pattern.fullmatch(number):
+            number = compact(number)
+            if not kernel.pattern.fullmatch(number):
+                return None
+    except Exception:
+        return None
+    if not kernel.accept(number):
+        return None
+    return kernel.prepare(number)
+
+
+KERNELS = {
+    'iban':        Kernel(re.compile('[0-9A-Z]+'), mod_97_10_checksum, 1,
+                          BASE36, lambda n: n[4:] + n[:4]),
+    'imei':        Kernel(re.compile('[0-9]{15}'), luhn_checksum),
+    'ca.sin':      Kernel(re.compile('[1-79][0-9]{8}'), luhn_checksum),
+    'in_.aadhaar': Kernel(re.compile('[2-9][0-9]{11}'), verhoeff_checksum,
+                          accept=_accept_aadhaar),
+    'damm':        Kernel(re.compile('[0-9]+'), damm_checksum),
+}
+
+
+def get_prefilter(
+    module: ModuleType,
+) -> Optional[Callable[[List[str]], 'np.ndarray']]:
+    '''Returns a function that flags the numbers that the stdnum module
+    would reject with a checksum error, or `None` if NumPy isn't
+    installed or the format has no kernel.
+    '''
+    name = module.__name__.partition('.')[2]
+    if np is None or name not in KERNELS:
+        return None
+
+    kernel = KERNELS[name]
+    compact = getattr(module, 'compact', str)
+
+    def prefilter(numbers: List[str]) -> 'np.ndarray':
+        # group the numbers that reach the checksum by length
+        groups = dict()
+        for i, number in enumerate(numbers):
+            number = _checked(kernel, compact, number)
+            if number is None:
+                continue
+            indexes, group = groups.setdefault(len(number), ([], []))
+            indexes.append(i)
+            group.append(number)
+
+        errors = np.zeros(len(numbers), dtype=bool)
+        for indexes, group in groups.values():
+            values = to_array(group, kernel.alphabet)
+            errors[indexes] = kernel.checksum(values) != kernel.valid
+        return errors
+
+    return prefilter
@@ -0,0 +1,305 @@
+'''
+Command line interface.
+
+    python -m pydentic validate --type iban --column 3 input.csv
+
+Validates a column of a CSV or NDJSON file in a pool of processes. Valid
+rows are written with the formatted value, and rejected rows with their
+error code (see `pydentic.exceptions`), to separate files, keeping the
+input order.
+'''
+from typing import (Any, Callable, Iterator, List, Optional, Tuple,
+                    Type)
+from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor, Future
+from argparse import ArgumentParser, ArgumentTypeError, Namespace
+from importlib import import_module
+from collections import deque
+from pathlib import Path
+import json
+import time
+import csv
+import sys
+import os
+
+from .core.utils import chunks
+
+Row = Any
+
+_type = None  # type: Optional[Type]
+
+
+def get_type(name: str) -> Type:
+    '''Returns the `pydentic.strings` type of a stdnum format by its
+    case-insensitive name, e.g. `iban` or `es.nif`. Only the wrapped
+    stdnum module is imported.
+    '''
+    from .strings import FORMATS
+    from .strings.registry import discover, is_package
+
+    *package, fmt = name.lower().split('.')
+    module, formats = 'pydentic.strings', FORMATS
+    if package:
+        packages = {n.lower(): n for n, entry in FORMATS.items()
+                    if is_package(entry)}
+        if len(package) > 1 or package[0] not in packages:
+            raise ValueError(f'unknown type: {name!r}')
+        pkg = packages[package[0]]
+        module, formats = f'{module}.{pkg}', FORMATS[pkg] or discover(pkg)
+
+    names = {n.lower(): n for n, entry in formats.items()
+             if not is_package(entry)}
+    try:
+        return getattr(import_module(module), names[fmt])
+    except (KeyError, ImportError):
+        raise ValueError(f'unknown type: {name!r}') from None
+
+
+def _init_worker(name: str) -> None:
+    global _type
+    _type = get_type(name)
+    _type._stdnum()
+
+
+def _validate_chunk(values: List[str]) -> Tuple[list, list]:
+    batch = _type.validate_many(values)
+    # send plain strings back to the parent process
+    values = [None if v is None else str(v) for v in batch.values]
+    return values, batch.errors
+
+
+class Reader(ABC):
+    '''Reads rows and gets and sets the validated column.
+    '''
+    def __init__(self, fp, column: str) -> None:
+        self.fp = fp
+        self.column = column
+
+    @abstractmethod
+    def __iter__(self) -> Iterator[Row]:
+        ...
+
+    @abstractmethod
+    def get(self, row: Row) -> str:
+        ...
+
+    @abstractmethod
+    def writer(self, fp) -> 'Writer':
+        ...
+
+
+class Writer(ABC):
+    def __init__(self, reader: Reader, fp) -> None:
+        self.reader = reader
+        self.fp = fp
+
+    @abstractmethod
+    def valid(self, row: Row, value: str) -> None:
+        ...
+
+    @abstractmethod
+    def rejected(self, row: Row, error: Optional[str]) -> None:
+        ...
+
+
+class CsvReader(Reader):
+    '''CSV rows. Columns are 1-based indexes, or names if the first row
+    is a header.
+    '''
+    def __init__(self, fp, column: str, header: bool = False) -> None:
+        super().__init__(fp, column)
+        self.rows = csv.reader(fp)
+        self.header = next(self.rows) if header else None
+        if column.isdigit():
+            self.index = int(column) - 1
+        elif self.header is not None:
+            self.index = self.header.index(column)
+        else:
+            raise ValueError(f'column {column!r} needs a header')
+
+    def __iter__(self) -> Iterator[Row]:
+        return self.rows
+
+    def get(self, row: Row) -> str:
+        try:
+            return row[self.index]
+        except IndexError:
+            return ''
+
+    def writer(self, fp) -> 'CsvWriter':
+        return CsvWriter(self, fp)
+
+
+class CsvWriter(Writer):
+    def __init__(self, reader: CsvReader, fp) -> None:
+        super().__init__(reader, fp)
+        self.csv = csv.writer(fp)
+        if reader.header is not None:
+            self.csv.writerow(reader.header)
+
+    def valid(self, row: Row, value: str) -> None:
+        row[self.reader.index] = value
+        self.csv.writerow(row)
+
+    def rejected(self, row: Row, error: Optional[str]) -> None:
+        self.csv.writerow([*row, error or ''])
+
+
+class NdjsonReader(Reader):
+    '''Newline-delimited JSON objects. Columns are keys.
+    '''
+    def __iter__(self) -> Iterator[Row]:
+        return (json.loads(line) for line in self.fp if line.strip())
+
+    def get(self, row: Row) -> str:
+        return row.get(self.column) or ''
+
+    def writer(self, fp) -> 'NdjsonWriter':
+        return NdjsonWriter(self, fp)
+
+
+class NdjsonWriter(Writer):
+    def _write(self, row: Row) -> None:
+        self.fp.write(json.dumps(row, ensure_ascii=False))
+        self.fp.write('\n')
+
+    def valid(self, row: Row, value: str) -> None:
+        row[self.reader.column] = value
+        self._write(row)
+
+    def rejected(self, row: Row, error: Optional[str]) -> None:
+        row['_error'] = error
+        self._write(row)
+
+
+def validate(
+    reader:     Reader,
+    valid:      Writer,
+    rejected:   Writer,
+    type:       str,
+    workers:    Optional[int] = None,
+    chunk_size: int = 10_000,
+) -> Tuple[int, int]:
+    '''Validates the rows in a pool of `workers` processes (in this
+    process if `0`), and writes them in the input order.
+
+    Returns:
+        Number of valid and rejected rows.
+    '''
+    counts = [0, 0]
+
+    def write(chunk: List[Row], result: Tuple[list, list]) -> None:
+        for row, value, error in zip(chunk, *result):
+            if value is None:
+                rejected.rejected(row, error)
+                counts[1] += 1
+            else:
+                valid.valid(row, value)
+                counts[0] += 1
+
+    if workers == 0:
+        _init_worker(type)
+        for chunk in chunks(reader, chunk_size):
+            write(chunk, _validate_chunk(list(map(reader.get, chunk))))
+        return tuple(counts)
+
+    workers = workers or os.cpu_count() or 1
+    pending = deque()  # type: deque[Tuple[List[Row], Future]]
+
+    with ProcessPoolExecutor(workers, initializer=_init_worker,
+                             initargs=(type,)) as pool:
+        for chunk in chunks(reader, chunk_size):
+            values = list(map(reader.get, chunk))
+            pending.append((chunk, pool.submit(_validate_chunk, values)))
+            # bound the chunks in flight
+            if len(pending) > 2 * workers:
+                write(*_result(pending.popleft()))
+        while pending:
+            write(*_result(pending.popleft()))
+
+    return tuple(counts)
+
+
+def _result(item: Tuple[List[Row], Future]) -> Tuple[List[Row], Any]:
+    chunk, future = item
+    return chunk, future.result()
+
+
+def _count(minimum: int) -> Callable[[str], int]:
+    '''Returns an argument type of integers not less than `minimum`.
+    '''
+    def count(string: str) -> int:
+        value = int(string)
+        if value < minimum:
+            raise ArgumentTypeError(f'must be at least {minimum}')
+        return value
+    count.__name__ = 'int'  # in argparse messages
+    return count
+
+
+def get_parser() -> ArgumentParser:
+    parser = ArgumentParser(prog='python -m pydentic')
+    commands = parser.add_subparsers(dest='command')
+    commands.required = True
+
+    cmd = commands.add_parser('validate', help='validate a column of a file')
+    cmd.add_argument('input', type=Path, help='CSV or NDJSON file')
+    cmd.add_argument('--type', '-t', required=True,
+                     help='pydentic.strings type, e.g. iban or es.nif')
+    cmd.add_argument('--column', '-c', required=True,
+                     help='CSV 1-based index or name, or NDJSON key')
+    cmd.add_argument('--format', '-f', choices=('csv', 'ndjson'),
+                     help='input format (default: from file extension)')
+    cmd.add_argument('--header', action='store_true',
+                     help='CSV first row is a header')
+    cmd.add_argument('--valid', type=Path,
+                     help='output for valid rows (default: INPUT.valid.EXT)')
+    cmd.add_argument('--rejected', type=Path,
+                     help='output for rejected rows '
+                          '(default: INPUT.rejected.EXT)')
+    cmd.add_argument('--workers', '-w', type=_count(0),
+                     help='worker processes, 0 to run in this process '
+                          '(default: number of CPUs)')
+    cmd.add_argument('--chunk-size', type=_count(1), default=10_000,
+                     help='rows per chunk (default: %(default)s)')
+    return parser
+
+
+def run_validate(args: Namespace) -> None:
+    fmt = args.format
+    if fmt is None:
+        fmt = 'ndjson' if args.input.suffix in {'.ndjson', '.jsonl'} else 'csv'
+    suffix = args.input.suffix or f'.{fmt}'
+    valid_path = args.valid or args.input.with_suffix(f'.valid{suffix}')
+    rejected_path = (args.rejected
+                     or args.input.with_suffix(f'.rejected{suffix}'))
+
+    with open(args.input, newline='', encoding='utf-8') as fp, \
+            open(valid_path, 'w', newline='', encoding='utf-8') as vfp, \
+            open(rejected_path, 'w', newline='', encoding='utf-8') as rfp:
+        if fmt == 'csv':
+            reader = CsvReader(fp, args.column, args.header)
+        else:
+            reader = NdjsonReader(fp, args.column)
+
+        start = time.perf_counter()
+        nvalid, nrejected = validate(reader, reader.writer(vfp),
+                                     reader.writer(rfp), args.type,
+                                     args.workers, args.chunk_size)
+        elapsed = time.perf_counter() - start
+
+    total = nvalid + nrejected
+    print(f'{total} rows ({nvalid} valid, {nrejected} rejected) '
+          f'in {elapsed:.2f}s: {total / (elapsed or 1):.0f} rows/s',
+          file=sys.stderr)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = get_parser()
+    args = parser.parse_args(argv)
+    if args.command == 'validate':
+        try:
+            get_type(args.type)
+        except ValueError as e:
+            parser.error(str(e))
+        run_validate(args)
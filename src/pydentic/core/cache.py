@@ -0,0 +1,146 @@
+'''
+Bounded LRU caches of validated values.
+'''
+from typing import (Any, Callable, Dict, Hashable, NamedTuple, NoReturn,
+                    Optional, Type)
+from collections import OrderedDict
+from threading import Lock
+from weakref import WeakSet
+
+DEFAULT_MAXSIZE = 10_000
+
+#: every cache, to clear them at once
+CACHES = WeakSet()  # type: WeakSet[LruCache]
+
+
+class CacheInfo(NamedTuple):
+    hits:      int
+    misses:    int
+    evictions: int
+    maxsize:   int
+    size:      int
+
+
+class CachedError(NamedTuple):
+    '''Error raised for a cached value. A new exception is raised on
+    every hit.
+    '''
+    type:  Type[Exception]
+    args:  tuple
+    attrs: Dict[str, Any]
+
+    @classmethod
+    def from_exc(cls, e: Exception) -> 'CachedError':
+        return cls(type(e), e.args, dict(vars(e)))
+
+    def throw(self) -> NoReturn:
+        exc = self.type(*self.args)
+        exc.__dict__.update(self.attrs)
+        raise exc
+
+
+class LruCache:
+    '''Thread-safe LRU cache of values or errors.
+    '''
+    def __init__(self, maxsize: int = DEFAULT_MAXSIZE) -> None:
+        self.maxsize   = maxsize
+        self.hits      = 0
+        self.misses    = 0
+        self.evictions = 0
+        self._data = OrderedDict()  # type: OrderedDict[Hashable, Any]
+        self._lock = Lock()
+        CACHES.add(self)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def info(self) -> CacheInfo:
+        return CacheInfo(self.hits, self.misses, self.evictions,
+                         self.maxsize, len(self._data))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def _put(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._data[key] = value
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def call(self, func: Callable, key: Hashable, *args: Any) -> Any:
+        '''Returns the cached result of `func(*args)`, or raises its
+        cached error.
+        '''
+        with self._lock:
+            try:
+                result = self._data[key]
+            except KeyError:
+                self.misses += 1
+                hit = False
+            except TypeError:
+                # unhashable
+                return func(*args)
+            else:
+                self._data.move_to_end(key)
+                self.hits += 1
+                hit = True
+
+        if hit:
+            if type(result) is CachedError:
+                result.throw()
+            return result
+
+        try:
+            result = func(*args)
+        except Exception as e:
+            self._put(key, CachedError.from_exc(e))
+            raise
+        self._put(key, result)
+        return result
+
+
+class Cached:
+    '''Opt-in cache of validated values. Enabled on a base class, the
+    cache is shared by all its subclasses.
+    '''
+    __slots__ = ()
+
+    _cache = None  # type: Optional[LruCache]
+
+    @classmethod
+    def enable_cache(cls, maxsize: int = DEFAULT_MAXSIZE) -> LruCache:
+        cls._cache = LruCache(maxsize)
+        return cls._cache
+
+    @classmethod
+    def disable_cache(cls) -> None:
+        cls._cache = None
+
+    @classmethod
+    def cache_info(cls) -> Optional[CacheInfo]:
+        return None if cls._cache is None else cls._cache.info()
+
+    @classmethod
+    def cache_clear(cls) -> None:
+        if cls._cache is not None:
+            cls._cache.clear()
+
+    @classmethod
+    def _cached(cls, func: Callable, v: Any) -> Any:
+        cache = cls._cache
+        if cache is None:
+            return func(v)
+        return cache.call(func, (cls, v), v)
+
+
+def clear_caches() -> None:
+    '''Clears every cache (e.g. after updating python-stdnum).
+    '''
+    for cache in list(CACHES):
+        cache.clear()
+
+
+__all__ = ['Cached', 'CacheInfo', 'LruCache', 'clear_caches']
@@ -1,15 +1,19 @@
-from typing import Type, TypeVar
+from typing import Any, Dict, Type, TypeVar, Iterator, Callable
 import re
 
+from .cache import Cached
+from .instrumentation import instrumented
+from .schema import json_schema, pattern_schema
 from .utils import unname_groups
 
 T = TypeVar('T')
 
 
-class RegExpString(str):
+class RegExpString(Cached, str):
     def __init_subclass__(cls, pattern: str):
         cls._pattern = re.compile(pattern)
 
+    @instrumented
     def __new__(cls: Type[T], string: str, **kwargs) -> T:
         try:
             parsed = cls._pattern.match(string).groupdict()
@@ -24,10 +28,30 @@ def __new__(cls: Type[T], string: str, **kwargs) -> T:
 
         return self
 
+    @classmethod
+    def __get_validators__(cls) -> Iterator[Callable]:
+        yield cls.validate
+
+    @classmethod
+    def validate(cls: Type[T], v: str) -> T:
+        return cls._cached(cls, v)
+
     @classmethod
     def __modify_schema__(cls, field_schema) -> None:
         pattern = unname_groups(cls._pattern.pattern)
         field_schema.update(type='string', pattern=pattern)
 
+    @classmethod
+    def __get_pydantic_core_schema__(cls, source: Any, handler: Any) -> Any:
+        return pattern_schema(cls._pattern, cls.validate)
+
+    @classmethod
+    def __get_pydantic_json_schema__(
+        cls,
+        core_schema: Any,
+        handler:     Any,
+    ) -> Dict[str, Any]:
+        return json_schema(cls)
+
 
 __all__ = ['RegExpString']
@@ -0,0 +1,217 @@
+'''
+Opt-in instrumentation of validation hot paths.
+
+    from pydentic.core import instrumentation
+
+    instrumentation.enable(exporter=print, interval=60)
+    ...
+    instrumentation.snapshot()
+    # {'pydentic.strings.Iban.parse': {'calls': 3, 'time': 0.0001, ...}}
+
+Counts calls, cumulative and histogrammed latency and error codes per
+class and operation. Enabling instrumentation binds wrappers in place of
+the instrumented methods, and disabling it binds the methods back, so
+disabled instrumentation costs nothing per call.
+'''
+from typing import Any, Callable, Dict, Optional
+from functools import wraps
+from bisect import bisect_left
+from threading import Lock
+from time import perf_counter
+import sys
+
+#: upper bounds (seconds) of the latency histogram buckets
+BUCKETS = (1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5,
+           1e-4, 2.5e-4, 5e-4, 1e-3, 1e-2, float('inf'))
+
+Snapshot = Dict[str, Dict[str, Any]]
+
+Exporter = Callable[[Snapshot], None]
+
+
+class Stats:
+    __slots__ = ('calls', 'time', 'histogram', 'errors')
+
+    def __init__(self) -> None:
+        self.calls     = 0
+        self.time      = 0.0
+        self.histogram = [0] * len(BUCKETS)
+        self.errors    = dict()  # type: Dict[str, int]
+
+    def as_dict(self) -> Dict[str, Any]:
+        return dict(calls=self.calls,
+                    time=self.time,
+                    histogram=dict(zip(map(str, BUCKETS), self.histogram)),
+                    errors=dict(self.errors))
+
+
+class Instrumentation:
+    '''Collects the stats of instrumented calls.
+    '''
+    def __init__(self) -> None:
+        self.enabled   = False
+        self.exporter  = None  # type: Optional[Exporter]
+        self.interval  = 60.0
+        self._stats    = dict()  # type: Dict[tuple, Stats]
+        self._lock     = Lock()
+        self._exported = perf_counter()
+
+    def enable(
+        self,
+        exporter: Optional[Exporter] = None,
+        interval: float = 60.0,
+    ) -> None:
+        '''Starts collecting stats. If `exporter` is set, it's called
+        with a snapshot at most every `interval` seconds, from an
+        instrumented call.
+        '''
+        self.exporter = exporter
+        self.interval = interval
+        self._exported = perf_counter()
+        self.enabled = True
+        _bind(self)
+
+    def disable(self) -> None:
+        self.enabled = False
+        _bind(None)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+    def call(
+        self,
+        cls:  type,
+        op:   str,
+        func: Callable,
+        *args:    Any,
+        **kwargs: Any
+    ) -> Any:
+        '''Calls `func(*args, **kwargs)`, recording its latency and error
+        code under `cls` and `op`.
+        '''
+        start = perf_counter()
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            end = perf_counter()
+            self._record(cls, op, end, end - start,
+                         getattr(e, 'code', None) or type(e).__name__)
+            raise
+        end = perf_counter()
+        self._record(cls, op, end, end - start, None)
+        return result
+
+    def _record(
+        self,
+        cls:     type,
+        op:      str,
+        now:     float,
+        elapsed: float,
+        error:   Optional[str],
+    ) -> None:
+        with self._lock:
+            try:
+                stats = self._stats[cls, op]
+            except KeyError:
+                stats = self._stats[cls, op] = Stats()
+            stats.calls += 1
+            stats.time += elapsed
+            stats.histogram[bisect_left(BUCKETS, elapsed)] += 1
+            if error is not None:
+                stats.errors[error] = stats.errors.get(error, 0) + 1
+
+            export = (self.exporter is not None
+                      and now - self._exported >= self.interval)
+            if export:
+                self._exported = now
+
+        if export:
+            self.export()
+
+    def snapshot(self) -> Snapshot:
+        '''Returns the stats per `module.Class.operation`.
+        '''
+        with self._lock:
+            return {f'{cls.__module__}.{cls.__qualname__}.{op}':
+                    stats.as_dict()
+                    for (cls, op), stats in self._stats.items()}
+
+    def export(self) -> None:
+        if self.exporter is not None:
+            self.exporter(self.snapshot())
+
+
+metrics = Instrumentation()
+
+
+#: instrumented methods
+INSTRUMENTED = []  # type: list
+
+#: wrappers of the instrumented methods, by method and instrumentation
+_wrappers = dict()  # type: Dict[tuple, Callable]
+
+
+def _wrapper(func: Callable, instrumentation: Instrumentation) -> Callable:
+    try:
+        return _wrappers[func, id(instrumentation)]
+    except KeyError:
+        pass
+
+    op = func.__name__
+
+    @wraps(func)
+    def wrapper(cls: type, *args: Any, **kwargs: Any) -> Any:
+        return instrumentation.call(cls, op, func, cls, *args, **kwargs)
+
+    _wrappers[func, id(instrumentation)] = wrapper
+    return wrapper
+
+
+def _owner(func: Callable) -> Optional[type]:
+    '''Returns the class that defines the method, or `None` if it's not
+    created yet.
+    '''
+    owner = sys.modules.get(func.__module__)
+    for name in func.__qualname__.split('.')[:-1]:
+        owner = getattr(owner, name, None)
+    return owner if isinstance(owner, type) else None
+
+
+def _bind(instrumentation: Optional[Instrumentation]) -> None:
+    '''Binds the wrappers of the instrumentation in place of the
+    instrumented methods, or the methods if `None`.
+    '''
+    for func in INSTRUMENTED:
+        owner = _owner(func)
+        if owner is None:
+            continue
+        name = func.__name__
+        method = owner.__dict__[name]
+        bound = (func if instrumentation is None
+                 else _wrapper(func, instrumentation))
+        if isinstance(method, (classmethod, staticmethod)):
+            bound = type(method)(bound)
+        setattr(owner, name, bound)
+
+
+def instrumented(func: Callable) -> Callable:
+    '''Instruments a method whose first argument is a class (a class
+    method or `__new__`). The method is only wrapped while
+    instrumentation is enabled.
+    '''
+    INSTRUMENTED.append(func)
+    if metrics.enabled:
+        return _wrapper(func, metrics)
+    return func
+
+
+enable   = metrics.enable
+disable  = metrics.disable
+reset    = metrics.reset
+snapshot = metrics.snapshot
+export   = metrics.export
+
+
+__all__ = ['Instrumentation', 'metrics', 'instrumented', 'enable', 'disable',
+           'reset', 'snapshot', 'export']
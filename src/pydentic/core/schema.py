@@ -0,0 +1,112 @@
+'''
+Pydantic v2 (pydantic-core) schemas of pydentic types.
+
+Types plug into pydantic v1 through `__get_validators__` and
+`__modify_schema__`, and into v2 through `__get_pydantic_core_schema__`
+and `__get_pydantic_json_schema__`, that build on these functions.
+pydantic-core is only imported when a v2 schema is built.
+
+Types defined by a pattern are validated by a core `str` schema with the
+pattern first, so malformed values are rejected without running any
+Python code.
+'''
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional, Pattern
+from functools import lru_cache
+import re
+
+from .utils import unname_groups
+
+if TYPE_CHECKING:  # pragma: no cover
+    from pydantic_core import CoreSchema
+
+INLINE_FLAGS = ((re.I, 'i'), (re.M, 'm'), (re.S, 's'), (re.X, 'x'))
+
+
+def core_pattern(pattern: Pattern) -> str:
+    '''Returns the pattern of a compiled regex, for a core `str` schema:
+    anchored at the start (as `re.match`), with its flags inlined.
+    '''
+    flags = ''.join(f for flag, f in INLINE_FLAGS if pattern.flags & flag)
+    source = unname_groups(pattern.pattern)
+    return '{}^(?:{})'.format(f'(?{flags})' if flags else '', source)
+
+
+@lru_cache(maxsize=None)
+def regex_engine(pattern: str) -> str:
+    '''Returns the Rust regex engine, or Python's if the pattern uses
+    what Rust regexes don't support (e.g. lookarounds).
+    '''
+    from pydantic_core import SchemaError, SchemaValidator, core_schema
+
+    try:
+        SchemaValidator(core_schema.str_schema(pattern=pattern))
+    except SchemaError:
+        return 'python-re'
+    return 'rust-regex'
+
+
+def pattern_schema(
+    pattern:  Pattern,
+    validate: Callable[[str], Any],
+) -> 'CoreSchema':
+    '''Returns the schema of a type defined by a pattern: a core `str`
+    schema with the pattern, and then the type's validator.
+    '''
+    from pydantic_core import core_schema
+
+    source = core_pattern(pattern)
+    return core_schema.no_info_after_validator_function(
+        validate,
+        core_schema.str_schema(pattern=source,
+                               regex_engine=regex_engine(source)),
+    )
+
+
+def plain_schema(
+    validate:  Callable[[str], Any],
+    serialize: Optional[Callable[[Any], str]] = None,
+) -> 'CoreSchema':
+    '''Returns the schema of a type validated by a single function, and
+    serialized to JSON by `serialize` (for types that aren't strings).
+    '''
+    from pydantic_core import core_schema
+
+    serialization = None
+    if serialize is not None:
+        serialization = core_schema.plain_serializer_function_ser_schema(
+            serialize, when_used='json')
+    return core_schema.no_info_plain_validator_function(
+        validate, serialization=serialization)
+
+
+def json_schema(cls: Any) -> Dict[str, Any]:
+    '''Returns the JSON Schema of a string type, as its v1 hook edits it.
+    '''
+    field_schema = dict(type='string')  # type: Dict[str, Any]
+    cls.__modify_schema__(field_schema)
+    return field_schema
+
+
+def plain_type(
+    serialize: Optional[Callable[[Any], str]] = None,
+) -> Callable[[type], type]:
+    '''Class decorator adding the v2 hooks of a type validated by its
+    `validate` classmethod (see `plain_schema`), whose JSON Schema is
+    the one of its v1 hook.
+    '''
+    def core_hook(cls: Any, source: Any, handler: Any) -> 'CoreSchema':
+        return plain_schema(cls.validate, serialize)
+
+    def json_hook(cls: Any, core_schema: Any, handler: Any) -> Dict[str, Any]:
+        return json_schema(cls)
+
+    def decorate(cls: type) -> type:
+        cls.__get_pydantic_core_schema__ = classmethod(core_hook)
+        cls.__get_pydantic_json_schema__ = classmethod(json_hook)
+        return cls
+
+    return decorate
+
+
+__all__ = ['core_pattern', 'json_schema', 'pattern_schema', 'plain_schema',
+           'plain_type', 'regex_engine']
@@ -1,10 +1,12 @@
 """
 String munging utils.
 """
-from typing import Optional, List, Dict
+from typing import (Optional, List, Iterable, Iterator, Mapping, Tuple,
+                    TypeVar)
 from functools import partial
 import re
 
+T = TypeVar('T')
 
 #: Removes capture groups' name (for JSON Schema patterns)
 unname_groups = partial(re.compile(r'\(\?P<\w+>').sub, '(')
@@ -23,30 +25,241 @@ def segment(string: str, *sizes: int, start: int = 0) -> List[str]:
     return [string[slice(*ab)] for ab in zip(a, b)]
 
 
+def chunks(items: Iterable[T], size: int) -> Iterator[List[T]]:
+    '''Splits an iterable into lists of `size` items (the last one may be
+    shorter).
+
+    >>> list(chunks('abcde', 2))
+    [['a', 'b'], ['c', 'd'], ['e']]
+    '''
+    from itertools import islice
+
+    items = iter(items)
+    while True:
+        chunk = list(islice(items, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def is_ascii(string: str) -> bool:
+    '''Returns whether all the characters of the string are ASCII, as
+    `str.isascii` (Python 3.7+).
+
+    >>> is_ascii('example.com'), is_ascii('例え.jp')
+    (True, False)
+    '''
+    try:
+        string.encode('ascii')
+    except UnicodeEncodeError:
+        return False
+    return True
+
+
+#: offsets of a parameter: key start and end, and value start and end
+#: (`-1` for flags, i.e. parameters without value)
+Span = Tuple[int, int, int, int]
+
+OWS = ' \t'
+
+UNESCAPE = partial(re.compile(r'\\(.)', re.S).sub, r'\1')
+
+
+def _quoted_end(string: str, start: int) -> int:
+    '''Returns the end of the quoted-string at `start`.
+    '''
+    i = start + 1
+    while True:
+        quote = string.find('"', i)
+        if quote == -1:
+            raise ValueError(f'unterminated quoted-string: {string!r}')
+        escape = string.find('\\', i, quote)
+        if escape == -1:
+            return quote + 1
+        i = escape + 2
+
+
+def _lstrip(string: str, start: int, end: int, chars: str) -> int:
+    while start < end and string[start] in chars:
+        start += 1
+    return start
+
+
+def _rstrip(string: str, start: int, end: int, chars: str) -> int:
+    while end > start and string[end - 1] in chars:
+        end -= 1
+    return end
+
+
+def _quoted_value(
+    string: str,
+    start:  int,
+    sep:    str,
+    ows:    str,
+) -> Tuple[int, int]:
+    '''Returns the end of the quoted-string value at `start`, and of its
+    parameter, where only `ows` may follow the value.
+    '''
+    end = _quoted_end(string, start)
+    stop = string.find(sep, end)
+    if stop == -1:
+        stop = len(string)
+    if string[end:stop].strip(ows):
+        raise ValueError(f'invalid parameter: {string!r}')
+    return end, stop
+
+
+def tokenize_params(
+    string:     str,
+    sep:        str = ';',
+    whitespace: bool = False,
+) -> List[Span]:
+    '''Returns the offsets of the parameters of the string, in a single
+    pass. Values may be (RFC 7230) quoted-strings, whose separators and
+    escaped characters are skipped. Empty parameters are ignored.
+
+    Args:
+        whitespace: skips whitespace around separators and `=`.
+
+    >>> tokenize_params('a=b;flag;c="d;e"')
+    [(0, 1, 2, 3), (4, 8, -1, -1), (9, 10, 11, 16)]
+    '''
+    ows = OWS if whitespace else ''
+    spans = []  # type: List[Span]
+    pos, end = 0, len(string)
+    while pos < end:
+        pos = _lstrip(string, pos, end, ows)
+        stop = string.find(sep, pos)
+        if stop == -1:
+            stop = end
+        eq = string.find('=', pos, stop)
+
+        if eq == -1:
+            key_end = _rstrip(string, pos, stop, ows)
+            if key_end > pos:
+                spans.append((pos, key_end, -1, -1))
+            pos = stop + 1
+            continue
+
+        if eq == pos:
+            raise ValueError(f'parameter without name: {string!r}')
+        key_end = _rstrip(string, pos, eq, ows)
+        value = _lstrip(string, eq + 1, stop, ows)
+        if value < end and string[value] == '"':
+            value_end, stop = _quoted_value(string, value, sep, ows)
+        else:
+            value_end = _rstrip(string, value, stop, ows)
+        spans.append((pos, key_end, value, value_end))
+        pos = stop + 1
+    return spans
+
+
+class Params(Mapping[str, Optional[str]]):
+    '''Read-only mapping of the parameters of a string. Keys are
+    lowercased, and values are unquoted when they are read.
+    '''
+    __slots__ = ('_string', '_spans', '_values')
+
+    def __init__(self, string: str, spans: List[Span]) -> None:
+        self._string = string
+        self._spans  = spans
+        self._values = None  # type: Optional[dict]
+
+    def _index(self, key: str) -> int:
+        # the last one wins, as in a dict
+        string = self._string
+        for i in range(len(self._spans) - 1, -1, -1):
+            start, end, _, _ = self._spans[i]
+            if end - start == len(key) and string[start:end].lower() == key:
+                return i
+        raise KeyError(key)
+
+    def _value(self, i: int) -> Optional[str]:
+        _, _, start, end = self._spans[i]
+        if start == -1:
+            return None
+        if start == end or self._string[start] != '"':
+            return self._string[start:end]
+        if self._values is None:
+            self._values = dict()
+        try:
+            return self._values[i]
+        except KeyError:
+            value = self._values[i] = UNESCAPE(self._string[start + 1:end - 1])
+            return value
+
+    def __getitem__(self, key: str) -> Optional[str]:
+        if not isinstance(key, str):
+            raise KeyError(key)
+        return self._value(self._index(key))
+
+    def __contains__(self, key: object) -> bool:
+        if not isinstance(key, str):
+            return False
+        try:
+            self._index(key)
+        except KeyError:
+            return False
+        return True
+
+    def __iter__(self) -> Iterator[str]:
+        seen = set()
+        for start, end, _, _ in self._spans:
+            key = self._string[start:end].lower()
+            if key not in seen:
+                seen.add(key)
+                yield key
+
+    def __len__(self) -> int:
+        return len({self._string[start:end].lower()
+                    for start, end, _, _ in self._spans})
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+    def __reduce__(self) -> Tuple[type, Tuple[str, List[Span]]]:
+        return type(self), (self._string, self._spans)
+
+
 def parse_params(
     string:     Optional[str],
     sep:        str = ';',
     whitespace: bool = False,
-) -> Optional[Dict[str, str]]:
+) -> Optional[Params]:
     '''Parses a string of parameters and values, and normalizes
-    parameters to lowercase.
+    parameters to lowercase. Values are decoded when they are read.
 
     Args:
         whitespace: strips whitespace between params.
 
     >>> parse_params('a=b;C=D')
     {'a': 'b', 'c': 'D'}
+    >>> parse_params('; q="a;b\\\\"c"; flag', whitespace=True)
+    {'q': 'a;b"c', 'flag': None}
     '''
-    if not string or not string.strip():
+    if not string:
         return None
+    spans = tokenize_params(string, sep, whitespace)
+    return Params(string, spans) if spans else None
 
-    if whitespace:
-        params = filter(None, map(str.strip, string.split(sep)))
-        params = (p.split('=') for p in params)
-    else:
-        params = (p.split('=') for p in string.strip().split(sep))
 
-    return {k.lower(): v for k, v in params}
+def parse_params_many(
+    strings:    Iterable[Optional[str]],
+    sep:        str = ';',
+    whitespace: bool = False,
+) -> List[Optional[Params]]:
+    '''Parses the parameters of many strings (e.g. a column of headers).
+    Repeated strings share their result.
+    '''
+    seen = dict()
+    results = []
+    for string in strings:
+        try:
+            params = seen[string]
+        except KeyError:
+            params = seen[string] = parse_params(string, sep, whitespace)
+        results.append(params)
+    return results
 
 
 def slug(text: str, to_identifier: bool = False) -> str:
@@ -1,4 +1,5 @@
-from typing import Optional, NoReturn
+from typing import Optional, NoReturn, Type
+from functools import lru_cache
 
 from stdnum.exceptions import (
     InvalidChecksum,
@@ -45,10 +46,28 @@ class ChecksumError(ContentError):
 }
 
 
+@lru_cache(maxsize=None)
+def get_error(exc: Type[Exception]) -> Optional[Type[PydenticError]]:
+    '''Returns the pydentic error of the nearest exception class in the
+    MRO of `exc` that is in `EXCMAPPING`. Resolved once per class.
+    '''
+    for cls in exc.__mro__:
+        try:
+            return EXCMAPPING[cls]
+        except KeyError:
+            pass
+    return None
+
+
+def error_code(e: Exception) -> Optional[str]:
+    '''Returns the code of the error `e` would be reraised as, if any.
+    '''
+    return getattr(get_error(type(e)), 'code', None)
+
+
 def reraise(e: Exception, v: str) -> NoReturn:
-    try:
-        exc = EXCMAPPING[type(e)]
-    except KeyError:
+    exc = get_error(type(e))
+    if exc is None:
         raise e
 
     try:
@@ -0,0 +1,312 @@
+'''
+Streaming multipart (`RFC 2046`__, `RFC 7578`__) body parser.
+
+    parser = MultipartParser('multipart/form-data; boundary=xyz')
+
+    for part in parser.iter_parts(request.stream):
+        save(part.filename, part.body)
+
+The body is consumed in chunks, and parts are yielded as soon as their
+closing delimiter is read. Part bodies are written to spooled files,
+that stay in memory up to `spool_size` bytes and then roll over to disk,
+so memory use doesn't depend on the size of the body.
+
+Bodies that are already in memory are split without copying: the bodies
+of the parts of `parse(data)` are `memoryview` slices of `data`.
+
+__ https://tools.ietf.org/html/rfc2046#section-5.1
+__ https://tools.ietf.org/html/rfc7578
+'''
+from typing import (Any, AsyncIterator, Dict, Iterable, Iterator, List,
+                    NamedTuple, Optional, Union)
+from tempfile import SpooledTemporaryFile
+import re
+
+from .core.utils import Params, parse_params
+from .strings.mime import ContentType
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+Body = Union[memoryview, SpooledTemporaryFile]
+
+#: content type of parts without `Content-Type`
+DEFAULT_CONTENT_TYPE = 'text/plain'
+
+#: longest transport padding after a delimiter
+MAX_PADDING = 1_024
+
+PREAMBLE, DELIMITER, HEADERS, BODY, EPILOGUE = range(5)
+
+PADDING = re.compile(rb'[ \t]*\r\n')
+
+HEADERS_END = re.compile(rb'\r\n\r\n')
+
+FOLDING = re.compile(r'\r\n[ \t]+')
+
+
+class Part(NamedTuple):
+    '''Part of a multipart body.
+
+    Attributes:
+        headers: header values, by lowercased name.
+        body: `memoryview` of the body, or a spooled file at its start.
+    '''
+    headers: Dict[str, str]
+    body:    Body
+
+    @property
+    def content_type(self) -> ContentType:
+        return ContentType.from_str(
+            self.headers.get('content-type', DEFAULT_CONTENT_TYPE))
+
+    @property
+    def disposition(self) -> Optional[Params]:
+        '''Parameters of `Content-Disposition` (the disposition type is
+        a parameter without value, e.g. `form-data`).
+        '''
+        return parse_params(self.headers.get('content-disposition'),
+                            whitespace=True)
+
+    @property
+    def name(self) -> Optional[str]:
+        disposition = self.disposition
+        return disposition.get('name') if disposition else None
+
+    @property
+    def filename(self) -> Optional[str]:
+        disposition = self.disposition
+        return disposition.get('filename') if disposition else None
+
+
+def parse_headers(block: bytes) -> Dict[str, str]:
+    '''Parses the header block of a part (without its empty line).
+    '''
+    try:
+        text = block.decode('utf-8')
+    except UnicodeDecodeError:
+        text = block.decode('latin-1')
+
+    headers = dict()  # type: Dict[str, str]
+    for line in FOLDING.sub(' ', text).split('\r\n'):
+        name, colon, value = line.partition(':')
+        if not colon or not name or name != name.strip():
+            raise ValueError(f'invalid part header: {line!r}')
+        headers[name.lower()] = value.strip(' \t')
+    return headers
+
+
+class MultipartParser:
+    '''Parser of the multipart bodies of a content type.
+
+    Args:
+        content_type: a `multipart/*` content type with a `boundary`.
+        spool_size: bytes of a part body kept in memory before it's
+            written to disk.
+        max_header_size: longest header block of a part.
+        chunk_size: bytes read from streams at a time.
+    '''
+    def __init__(
+        self,
+        content_type:    Union[str, ContentType],
+        spool_size:      int = 1 << 20,
+        max_header_size: int = 16 << 10,
+        chunk_size:      int = 64 << 10,
+    ) -> None:
+        content_type = ContentType.validate(content_type)
+        boundary = (content_type.params or {}).get('boundary')
+        if content_type.type != 'multipart' or not boundary:
+            raise ValueError(f'not a multipart content type: {content_type}')
+        if len(boundary) > 70:
+            raise ValueError(f'boundary too long: {boundary!r}')
+
+        self.content_type    = content_type
+        self.boundary        = boundary.encode('ascii')
+        self.spool_size      = spool_size
+        self.max_header_size = max_header_size
+        self.chunk_size      = chunk_size
+
+        escaped = re.escape(self.boundary)
+        self._delimiter = re.compile(rb'\r\n--' + escaped)
+        self._first = re.compile(rb'(?:\A|\r\n)--' + escaped)
+        self._scanners = {
+            PREAMBLE:  self._scan_body,
+            DELIMITER: self._scan_delimiter,
+            HEADERS:   self._scan_headers,
+            BODY:      self._scan_body,
+        }
+        self.reset()
+
+    # zero-copy
+
+    def parse(self, data: Buffer) -> Iterator[Part]:
+        '''Yields the parts of a whole body, whose bodies are slices of
+        `data`.
+        '''
+        view = memoryview(data)
+        match = self._first.search(data)
+        if match is None:
+            raise ValueError('multipart delimiter not found')
+
+        while True:
+            pos = match.end()
+            if view[pos:pos + 2] == b'--':
+                return
+            padding = PADDING.match(data, pos)
+            if padding is None or padding.end() - pos > MAX_PADDING:
+                raise ValueError('invalid multipart delimiter')
+            pos = padding.end()
+
+            if view[pos:pos + 2] == b'\r\n':
+                headers, start = dict(), pos + 2  # type: Dict[str, str], int
+            else:
+                end = HEADERS_END.search(data, pos)
+                if end is None:
+                    raise ValueError('incomplete multipart body')
+                headers = parse_headers(bytes(view[pos:end.start()]))
+                start = end.end()
+
+            match = self._delimiter.search(data, start)
+            if match is None:
+                raise ValueError('incomplete multipart body')
+            yield Part(headers, view[start:match.start()])
+
+    # streaming
+
+    def reset(self) -> None:
+        # a preamble CRLF, so the first delimiter can open the body
+        self._buffer  = bytearray(b'\r\n')
+        self._state   = PREAMBLE
+        self._headers = dict()  # type: Dict[str, str]
+        self._spool   = None  # type: Optional[SpooledTemporaryFile]
+
+    def _flush(self, size: int) -> None:
+        '''Moves the first `size` bytes of the buffer to the spool of the
+        current part (or discards them, out of a part).
+        '''
+        if self._state == BODY:
+            with memoryview(self._buffer) as view:
+                self._spool.write(view[:size])
+        del self._buffer[:size]
+
+    def _scan_body(self, parts: List[Part]) -> bool:
+        '''Scans the preamble or a part body up to the next delimiter,
+        and completes the part. Returns whether scanning can go on.
+        '''
+        buffer = self._buffer
+        match = self._delimiter.search(buffer)
+        if match is None:
+            # the end of the buffer may be the start of a delimiter
+            size = len(buffer) - len(self.boundary) - 3
+            if size > 0:
+                self._flush(size)
+            return False
+        self._flush(match.start())
+        if self._state == BODY:
+            self._spool.seek(0)
+            parts.append(Part(self._headers, self._spool))
+        del buffer[:match.end() - match.start()]
+        self._state = DELIMITER
+        return True
+
+    def _scan_delimiter(self, parts: List[Part]) -> bool:
+        '''Scans the end of a delimiter: the close delimiter, or the
+        transport padding before the part headers.
+        '''
+        buffer = self._buffer
+        if len(buffer) < 2:
+            return False
+        if buffer.startswith(b'--'):
+            self._state = EPILOGUE
+            buffer.clear()
+            return False
+        padding = PADDING.match(buffer)
+        if padding is None:
+            if len(buffer) > MAX_PADDING or buffer.strip(b' \t\r'):
+                raise ValueError('invalid multipart delimiter')
+            return False
+        del buffer[:padding.end()]
+        self._state = HEADERS
+        return True
+
+    def _scan_headers(self, parts: List[Part]) -> bool:
+        '''Scans the header block of a part, and starts its body.
+        '''
+        buffer = self._buffer
+        if buffer.startswith(b'\r\n'):
+            self._headers = dict()
+            del buffer[:2]
+        else:
+            end = buffer.find(b'\r\n\r\n')
+            if end == -1:
+                if len(buffer) > self.max_header_size:
+                    raise ValueError('part headers too long')
+                return False
+            self._headers = parse_headers(bytes(buffer[:end]))
+            del buffer[:end + 4]
+        self._spool = SpooledTemporaryFile(max_size=self.spool_size)
+        self._state = BODY
+        return True
+
+    def feed(self, data: Buffer) -> List[Part]:
+        '''Consumes a chunk of the body, and returns the parts it
+        completes.
+        '''
+        if self._state == EPILOGUE:
+            return []
+
+        self._buffer += data
+        parts = []  # type: List[Part]
+        while self._scanners[self._state](parts):
+            pass
+        return parts
+
+    def close(self) -> None:
+        '''Checks that the body was complete.
+        '''
+        if self._state != EPILOGUE:
+            raise ValueError('incomplete multipart body')
+
+    def iter_parts(
+        self,
+        source: Union[Any, Iterable[Buffer]],
+    ) -> Iterator[Part]:
+        '''Yields the parts of a binary file or an iterable of chunks.
+        Files with `readinto` are read into a reused buffer.
+        '''
+        self.reset()
+        if hasattr(source, 'readinto'):
+            chunk = bytearray(self.chunk_size)
+            with memoryview(chunk) as view:
+                while True:
+                    size = source.readinto(chunk)
+                    if not size:
+                        break
+                    yield from self.feed(view[:size])
+        elif hasattr(source, 'read'):
+            for data in iter(lambda: source.read(self.chunk_size), b''):
+                yield from self.feed(data)
+        else:
+            for data in source:
+                yield from self.feed(data)
+        self.close()
+
+    async def aiter_parts(self, source: Any) -> AsyncIterator[Part]:
+        '''Yields the parts of an async stream: an object with an async
+        `read(size)` method, or an async iterable of chunks.
+        '''
+        self.reset()
+        if hasattr(source, 'read'):
+            while True:
+                data = await source.read(self.chunk_size)
+                if not data:
+                    break
+                for part in self.feed(data):
+                    yield part
+        else:
+            async for data in source:
+                for part in self.feed(data):
+                    yield part
+        self.close()
+
+
+__all__ = ['MultipartParser', 'Part', 'parse_headers']
@@ -0,0 +1,85 @@
+'''
+Streaming validation of records.
+
+    from pydentic.strings import Iban, Vatin
+
+    for result in validate(records, fields={'iban': Iban, 'vat': Vatin}):
+        if result.valid:
+            save(result.values)
+
+Records are validated one at a time as they are consumed, so feeds of
+any size are processed in constant memory, and without building a
+pydantic model for each record.
+'''
+from typing import (Any, Callable, Dict, Iterable, Iterator, Mapping,
+                    NamedTuple, Optional, Sequence, Union)
+
+from .exceptions import error_code
+from .strings.base import Stdnum
+
+Key = Union[str, int]
+
+Record = Union[Mapping[str, Any], Sequence[Any]]
+
+MISSING = 'missing'
+
+
+class Result(NamedTuple):
+    '''Validation result of a record.
+
+    Attributes:
+        record: the input record.
+        values: validated values of the valid fields.
+        errors: error codes of the invalid fields (`missing` if the
+            field is not in the record, `None` if the error has no
+            code).
+    '''
+    record: Record
+    values: Dict[Key, Any]
+    errors: Dict[Key, Optional[str]]
+
+    @property
+    def valid(self) -> bool:
+        return not self.errors
+
+
+def get_validator(type: type) -> Callable[[Any], Any]:
+    '''Returns the function that validates (and formats) values of a
+    `Stdnum`, `RegExpString` or `AnyUri` subclass: the validator of its
+    pydantic fields, that uses the cache of the type if it's enabled
+    (see `Cached`).
+    '''
+    if issubclass(type, Stdnum):
+        return type.parse
+    return type.validate
+
+
+def _code(e: Exception) -> Optional[str]:
+    return getattr(e, 'code', None) or error_code(e)
+
+
+def validate(
+    records: Iterable[Record],
+    fields:  Mapping[Key, type],
+) -> Iterator[Result]:
+    '''Lazily validates the fields of every record. Records can be
+    mappings (fields are keys) or sequences (fields are indexes).
+    '''
+    validators = [(key, get_validator(type)) for key, type in fields.items()]
+
+    for record in records:
+        values, errors = {}, {}
+        for key, validator in validators:
+            try:
+                value = record[key]
+            except (KeyError, IndexError):
+                errors[key] = MISSING
+                continue
+            try:
+                values[key] = validator(value)
+            except Exception as e:
+                errors[key] = _code(e)
+        yield Result(record, values, errors)
+
+
+__all__ = ['Result', 'validate']
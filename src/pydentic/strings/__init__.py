@@ -1,108 +1,129 @@
-from typing import Union, Optional, Callable, TypeVar, Type, Iterator, Tuple
-from types import ModuleType, new_class
+'''
+Pydantic types for every format in python-stdnum.
+
+Classes are created on first access, so importing a type only imports
+the stdnum module it wraps, e.g. ``from pydentic.strings import Iban``
+only imports ``stdnum.iban``. Country packages (``pydentic.strings.ad``)
+are created the same way, on first attribute access or import.
+
+Names and docstrings are read from the manifest in `registry`, so
+neither the stdnum directory nor its modules are touched until a value
+is validated.
+'''
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional
+from importlib.util import spec_from_loader
 from importlib import import_module
-from pkgutil import iter_modules
-from functools import partial
+from types import ModuleType, new_class
 from pathlib import Path
 import sys
-import re
 
 import stdnum
 
-from ..exceptions import reraise
-# from .uri import AnyUrn
+from .base import Stdnum
+from .registry import Format, discover, is_package, load
 
-T = TypeVar('T')
+if TYPE_CHECKING:  # pragma: no cover
+    from .detection import Profile
 
-DESCR = re.compile(r'^(.*?)\s*?\((.*?)\)')
 
+def _new_stdnum(name: str, fmt: Format, owner: str) -> type:
+    module, doc = fmt
+    return new_class(name, (Stdnum,), {'module': module, 'doc': doc},
+                     lambda ns: ns.update(__module__=owner))
 
-class Stdnum(str):
 
-    def __init_subclass__(cls, module: Union[str, ModuleType]):
-        if isinstance(module, str):
-            module = import_module(f'stdnum.{module}')
-        cls.__doc__   = module.__doc__.strip().splitlines()[0].rstrip('.')
-        cls._validate = lambda v: getattr(module, 'validate')(v)
-        cls._format   = lambda v: getattr(module, 'format')(v)
-        # if cls.__name__ in {'Issn', 'Isbn', 'Isan'}:
-        #     cls.urn = property(lambda s: str(AnyUrn(nid=cls.__name__.lower(),
-        #                                             nss=module.compact(s))))
+class StdnumPackage(ModuleType):
+    '''Country (or standard) subpackage whose classes are created on
+    first access.
+    '''
+    def __init__(
+        self,
+        name:    str,
+        formats: Optional[Dict[str, Format]] = None,
+    ) -> None:
+        super().__init__(f'{__name__}.{name}')
+        self.__path__ = [str(Path(stdnum.__path__[0], name))]
+        self.__package__ = self.__name__
+        self.__formats = discover(name) if formats is None else formats
 
-    @classmethod
-    def __modify_schema__(cls, field_schema):
-        try:
-            title, description = DESCR.match(cls.__doc__).groups()
-        except AttributeError:
-            title, description = cls.__name__, cls.__doc__
-        field_schema.update(title=title, description=description)
-
-    @classmethod
-    def __get_validators__(cls) -> Iterator[Callable]:
-        yield cls.validate
-        yield cls.format
-
-    @classmethod
-    def validate(cls, v: str) -> str:
+    def __getattr__(self, name: str) -> type:
         try:
-            return cls._validate(v)
-        except Exception as e:
-            reraise(e, v)
+            fmt = self.__formats[name]
+        except KeyError:
+            raise AttributeError(
+                f'module {self.__name__!r} has no attribute {name!r}'
+            ) from None
+        cls = _new_stdnum(name, fmt, self.__name__)
+        setattr(self, name, cls)
+        return cls
 
-    @classmethod
-    def format(cls: Type[T], v: str) -> T:
-        try:
-            return cls(cls._format(v))
-        except AttributeError:
-            return cls(v)
-        except Exception as e:
-            reraise(e, v)
-
-
-TERM = ('account', 'catastral', 'code', 'id', 'fiscale',
-        'kimlik', 'note', 'numero', 'nummer')
-
-# capitalize the second term in compund words
-capitalize = partial(re.compile('({})$'.format('|'.join(TERM))).sub,
-                     lambda m: m.group(0).capitalize())
-
-
-# def traverse_modules(package: ModuleType) -> Tuple[Path, str, Optional[str]]:
-#     pkgdir, = map(Path, package.__path__)
-#     for _, mod, ispkg in iter_modules([pkgdir]):
-#         if ispkg:
-#             for _, modsub, _ in iter_modules([pkgdir / mod]):
-#                 yield pkgdir, modsub, mod
-#         else:
-#             yield pkgdir, mod, None
-
-# for path, mod, subpkg in traverse_modules(stdnum):
-#     if mod in ():
-#         continue
-
-
-# TODO: decouple with traverse_modules
-pkgdir, = stdnum.__path__
-for _, mod, ispkg in iter_modules([pkgdir]):
-    if ispkg:
-        subpkgdir = Path(pkgdir, mod)
-        module = ModuleType(f'{__name__}.{mod}')
-        module.__path__ = [str(subpkgdir / mod)]
-        for _, modsub, _ in iter_modules([subpkgdir]):
-            name = capitalize(modsub.capitalize())
-            cls = new_class(name, (Stdnum,), {'module': f'{mod}.{modsub}'})
-            setattr(module, name, cls)
-        globals().update({mod: module})
-        sys.modules[f'{__name__}.{mod}'] = module
-
-    elif not mod.startswith('mod_') and mod not in (
-            # iso9362 deprecated in favor of bic
-            'exceptions', 'numdb', 'util', 'iso9362',
-            # algorithms
-            'luhn', 'damn', 'verhoeff'):
-        name = mod.capitalize()
-        globals()[name] = new_class(name, (Stdnum,), {'module': mod})
-
-
-del (ispkg, iter_modules, mod, modsub, module, ModuleType, partial, Path, re,
-     stdnum, Stdnum, subpkgdir, capitalize, cls, name, pkgdir, TERM, new_class)
+    def __dir__(self) -> List[str]:
+        return sorted({*super().__dir__(), *self.__formats})
+
+
+class StdnumFinder:
+    '''Imports country subpackages (e.g. `pydentic.strings.ad`) that
+    don't exist in the filesystem.
+
+    Implements the meta path finder and loader protocols without their
+    `importlib.abc` bases, which are slow to import.
+    '''
+    def find_spec(self, fullname, path, target=None):
+        parent, _, name = fullname.rpartition('.')
+        if parent == __name__ and is_package(FORMATS.get(name, ())):
+            return spec_from_loader(fullname, self)
+        return None
+
+    def create_module(self, spec) -> ModuleType:
+        name = spec.name.rpartition('.')[2]
+        return StdnumPackage(name, FORMATS[name])
+
+    def exec_module(self, module: ModuleType) -> None:
+        pass
+
+
+FORMATS = load()
+
+sys.meta_path.append(StdnumFinder())
+
+
+def detect(value: str, exhaustive: bool = False) -> List[str]:
+    '''Returns the names of the formats the value is valid for, e.g.
+    `['Iban', 'es.Iban']` (see `detection`).
+    '''
+    from .detection import detector
+    return detector().detect(value, exhaustive)
+
+
+def profile(values: Iterable[str]) -> 'Profile':
+    '''Returns how many values of a column are valid for every format.
+    '''
+    from .detection import detector
+    return detector().profile(values)
+
+
+def __getattr__(name: str):
+    try:
+        entry = FORMATS[name]
+    except KeyError:
+        raise AttributeError(
+            f'module {__name__!r} has no attribute {name!r}'
+        ) from None
+
+    if is_package(entry):
+        # importing sets the subpackage as an attribute of this module
+        return import_module(f'{__name__}.{name}')
+
+    cls = globals()[name] = _new_stdnum(name, entry, __name__)
+    return cls
+
+
+def __dir__() -> List[str]:
+    return sorted({*globals(), *FORMATS})
+
+
+# module-level `__getattr__` requires Python 3.7 (PEP 562)
+if sys.version_info < (3, 7):
+    for _name in FORMATS:
+        __getattr__(_name)
+    del _name
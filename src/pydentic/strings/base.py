@@ -0,0 +1,252 @@
+from typing import (Any, Dict, Union, Optional, Callable, TypeVar, Type,
+                    Iterator, Iterable, NamedTuple, List)
+from types import ModuleType
+from importlib import import_module
+from itertools import repeat
+import re
+
+from ..core.cache import Cached
+from ..core.instrumentation import instrumented
+from ..core.schema import json_schema, plain_schema
+from ..core.utils import chunks
+from ..exceptions import ChecksumError, reraise, error_code
+# from .uri import AnyUrn
+
+T = TypeVar('T')
+
+DESCR = re.compile(r'^(.*?)\s*?\((.*?)\)')
+
+#: values per chunk in batch validation
+BATCH_SIZE = 65_536
+
+
+def _compact_format(number):
+    return compact(number)  # noqa: F821
+
+
+def formats_compact(module: ModuleType) -> bool:
+    '''Whether the module's `format` just returns `compact(number)`, i.e.
+    the compact value returned by `validate` is already formatted.
+    '''
+    format = module.format
+    if format is getattr(module, 'compact', None):
+        return True
+
+    try:
+        code = format.__code__
+    except AttributeError:
+        return False
+    ref = _compact_format.__code__
+    return ((code.co_code, code.co_names, code.co_argcount)
+            == (ref.co_code, ref.co_names, ref.co_argcount))
+
+
+def build_parser(cls: Type[T], module: ModuleType) -> Callable[[str], T]:
+    '''Returns a function that validates and formats a value in a single
+    call to the stdnum module.
+    '''
+    validate = module.validate
+    format   = getattr(module, 'format', None)
+
+    if format is None or formats_compact(module):
+        def parse(v: str) -> T:
+            return cls(validate(v))
+    else:
+        def parse(v: str) -> T:
+            return cls(format(validate(v)))
+
+    return parse
+
+
+class Batch(NamedTuple):
+    '''Columnar result of a batch validation.
+
+    Attributes:
+        values: formatted values, `None` if invalid.
+        valid: validity mask.
+        errors: error codes (see `pydentic.exceptions`), `None` if valid
+            or the error has no code.
+    '''
+    values: List[Optional[str]]
+    valid:  List[bool]
+    errors: List[Optional[str]]
+
+
+class Check(NamedTuple):
+    '''Result of checking a value.
+
+    Attributes:
+        ok: whether the value is valid.
+        value: formatted value, `None` if invalid.
+        code: error code (see `pydentic.exceptions`), `None` if valid or
+            the error has no code.
+        message: error message, `None` if valid.
+    '''
+    ok:      bool
+    value:   Optional[str] = None
+    code:    Optional[str] = None
+    message: Optional[str] = None
+
+
+class Stdnum(Cached, str):
+
+    def __init_subclass__(
+        cls,
+        module: Union[str, ModuleType],
+        doc:    Optional[str] = None,
+    ):
+        cls._module = module
+        if isinstance(module, ModuleType):
+            cls._bind(module)
+        if doc is None:
+            doc = cls._stdnum().__doc__.strip().splitlines()[0].rstrip('.')
+        cls.__doc__ = doc
+        # if cls.__name__ in {'Issn', 'Isbn', 'Isan'}:
+        #     cls.urn = property(lambda s: str(AnyUrn(nid=cls.__name__.lower(),
+        #                                             nss=module.compact(s))))
+
+    @classmethod
+    def _bind(cls, module: ModuleType) -> None:
+        cls._module   = module
+        cls._validate = staticmethod(module.validate)
+        # modules without `format` leave the value as is
+        cls._format   = staticmethod(getattr(module, 'format', str))
+        cls._parse    = staticmethod(build_parser(cls, module))
+
+    @classmethod
+    def _stdnum(cls) -> ModuleType:
+        '''Returns the wrapped stdnum module, importing it and binding its
+        functions on first use.
+        '''
+        if isinstance(cls._module, str):
+            cls._bind(import_module(f'stdnum.{cls._module}'))
+        return cls._module
+
+    # placeholders until the stdnum module is imported
+
+    @classmethod
+    def _validate(cls, v: str) -> str:
+        cls._stdnum()
+        return cls._validate(v)
+
+    @classmethod
+    def _format(cls, v: str) -> str:
+        cls._stdnum()
+        return cls._format(v)
+
+    @classmethod
+    def _parse(cls: Type[T], v: str) -> T:
+        cls._stdnum()
+        return cls._parse(v)
+
+    @classmethod
+    def __modify_schema__(cls, field_schema):
+        try:
+            title, description = DESCR.match(cls.__doc__).groups()
+        except AttributeError:
+            title, description = cls.__name__, cls.__doc__
+        field_schema.update(title=title, description=description)
+
+    @classmethod
+    def __get_validators__(cls) -> Iterator[Callable]:
+        yield cls.parse
+
+    @classmethod
+    def __get_pydantic_core_schema__(cls, source: Any, handler: Any) -> Any:
+        return plain_schema(cls.parse)
+
+    @classmethod
+    def __get_pydantic_json_schema__(
+        cls,
+        core_schema: Any,
+        handler:     Any,
+    ) -> Dict[str, Any]:
+        return json_schema(cls)
+
+    @classmethod
+    @instrumented
+    def parse(cls: Type[T], v: str) -> T:
+        '''Validates and formats the value.
+        '''
+        return cls._cached(cls._parse_value, v)
+
+    @classmethod
+    def _parse_value(cls: Type[T], v: str) -> T:
+        try:
+            return cls._parse(v)
+        except Exception as e:
+            reraise(e, v)
+
+    @classmethod
+    def check(cls, v: str) -> Check:
+        '''Validates and formats the value, returning the error instead
+        of raising it.
+        '''
+        try:
+            value = cls._parse(v)
+        except Exception as e:
+            return Check(False, None, error_code(e), str(e))
+        return Check(True, value)
+
+    @classmethod
+    def validate_many(cls, values: Iterable[str]) -> Batch:
+        '''Validates and formats every value. Invalid values are reported
+        in the result, so no pydentic error is raised.
+
+        If NumPy is installed, checksums of some formats (IBAN, IMEI...)
+        are checked in bulk, and the stdnum module is only called for the
+        values that pass.
+        '''
+        # NumPy is only imported for batch validation
+        from ..algorithms import get_prefilter
+
+        module = cls._stdnum()
+        parse = cls._parse
+        prefilter = get_prefilter(module)
+        batch = Batch([], [], [])
+        add_value, add_valid, add_error = (
+            batch.values.append, batch.valid.append, batch.errors.append)
+
+        for chunk in chunks(values, BATCH_SIZE):
+            if prefilter is None:
+                rejected = repeat(False)
+            else:
+                rejected = prefilter(chunk)
+
+            for v, checksum in zip(chunk, rejected):
+                if checksum:
+                    add_value(None)
+                    add_valid(False)
+                    add_error(ChecksumError.code)
+                    continue
+                try:
+                    value = parse(v)
+                except Exception as e:
+                    add_value(None)
+                    add_valid(False)
+                    add_error(error_code(e))
+                else:
+                    add_value(value)
+                    add_valid(True)
+                    add_error(None)
+
+        return batch
+
+    @classmethod
+    @instrumented
+    def validate(cls, v: str) -> str:
+        try:
+            return cls._validate(v)
+        except Exception as e:
+            reraise(e, v)
+
+    @classmethod
+    @instrumented
+    def format(cls: Type[T], v: str) -> T:
+        try:
+            return cls(cls._format(v))
+        except Exception as e:
+            reraise(e, v)
+
+
+__all__ = ['Batch', 'Check', 'Stdnum']
@@ -0,0 +1,328 @@
+'''
+Detection of the formats a value could be.
+
+    >>> detector().detect('978-0-471-11709-4')
+    ['Ean', 'Gs1_128', 'Isbn']
+
+Values are first compacted (separators removed and uppercased) and looked
+up in an index of signatures: the character class and length of the
+compact value, and its leading two letters. Only the formats of the
+signature are validated.
+
+The index is generated for a python-stdnum version (see `write_index`)
+by validating probes of every length and character class. A format gets
+the signature of a probe if the probe fails on anything but the length or
+the format (e.g. the checksum). Two-letter prefixes are only kept when a
+format accepts no other than its country code (e.g. VAT numbers). With
+another python-stdnum version, every format is validated until the index
+is regenerated (see `pydentic.tools.update_stdnum_manifest`).
+
+Probes can't cover every format: some keep separators (`Mac`), pad
+values (`nl.Btw`), or check more than the character class. The index is
+checked against a corpus of real values, the arguments in the docstrings
+of all stdnum modules (in a few spellings): formats that accept values
+of the corpus that their signatures don't cover are validated whatever
+the signature of the value.
+'''
+from typing import (Callable, Counter, Dict, Iterable, List, NamedTuple,
+                    Optional, Set, Tuple)
+from collections import Counter as counter, defaultdict
+from importlib import import_module
+from functools import lru_cache
+from pathlib import Path
+import logging
+import json
+import re
+
+import stdnum
+from stdnum.exceptions import InvalidFormat, InvalidLength
+
+from ..core.utils import is_ascii
+from .registry import discover, is_package, load
+
+log = logging.getLogger(__name__)
+
+INDEX = Path(__file__).with_name('signatures.json')
+
+INDEX_VERSION = 2
+
+#: longer values share the signatures of this length
+MAXLEN = 40
+
+#: characters removed by `compact`
+SEPARATORS = ' \t-./:,+()_'
+
+DIGITS = frozenset('0123456789')
+
+#: signature prefix of values without two leading letters, and of formats
+#: that accept any
+NO_PREFIX  = ''
+ANY_PREFIX = '*'
+
+#: character class, length and prefix
+Signature = Tuple[str, int, str]
+
+#: signature of formats that the index can't tell
+UNCERTAIN = ('any', 0, ANY_PREFIX)  # type: Signature
+
+_compact = str.maketrans('', '', SEPARATORS)
+
+
+def compact(value: str) -> str:
+    return value.translate(_compact).upper()
+
+
+def charclass(value: str) -> str:
+    if not is_ascii(value):
+        return 'other'
+    if value.isdigit():
+        return 'digits'
+    if value.isalpha():
+        return 'alpha'
+    if value.isalnum():
+        return 'alnum'
+    return 'other'
+
+
+def prefix(value: str) -> str:
+    head = value[:2]
+    return head if len(head) == 2 and head.isalpha() else NO_PREFIX
+
+
+def signature(value: str) -> Signature:
+    value = compact(value)
+    return charclass(value), min(len(value), MAXLEN), prefix(value)
+
+
+# index generation
+
+#: values in docstrings, e.g. `>>> compact('BE 428759497')`
+EXAMPLE = re.compile(r">>> \w+\('([^'\n]*)'")
+
+
+def formats() -> Dict[str, str]:
+    '''Returns the stdnum module of every format, by name (e.g.
+    `es.Nif`).
+    '''
+    result = dict()
+    for name, entry in load().items():
+        if is_package(entry):
+            for subname, (module, _) in (entry or discover(name)).items():
+                result[f'{name}.{subname}'] = module
+        else:
+            result[name] = entry[0]
+    return result
+
+
+def probes(country: Optional[str]) -> Iterable[str]:
+    heads = ['AA', 'QQ', 'XX']
+    if country:
+        heads.append(country.upper())
+
+    for n in range(1, MAXLEN + 1):
+        for digits in ('1' * n, '0' * n, '9' * n, ('1234567890' * 5)[:n]):
+            yield digits
+        for letter in 'AKXZ':
+            yield letter * n
+            yield letter + '1' * (n - 1)
+            yield '1' * (n - 1) + letter
+        for head in heads:
+            if n > 2:
+                yield head + '1' * (n - 2)
+                yield head + '1' * (n - 3) + 'X'
+
+
+def corpus(modules: Iterable[str]) -> Set[str]:
+    '''Returns the values in the docstrings of the stdnum modules, as
+    written, lowercased, and grouped with spaces and dashes.
+    '''
+    result = set()
+    for module in modules:
+        doc = import_module(f'stdnum.{module}').__doc__ or ''
+        for value in EXAMPLE.findall(doc):
+            result.add(value)
+            result.add(value.lower())
+            for size, sep in ((4, ' '), (3, '-')):
+                result.add(sep.join(value[i:i + size]
+                                    for i in range(0, len(value), size)))
+    return result
+
+
+def _covers(signatures: Set[Signature], value: str) -> bool:
+    cls, length, head = signature(value)
+    if not length or cls == 'other':  # not looked up
+        return True
+    return bool({(cls, length, head), (cls, length, ANY_PREFIX)}
+                & signatures)
+
+
+def _signatures(module: str, values: Iterable[str]) -> Set[Signature]:
+    mod = import_module(f'stdnum.{module}')
+    country = module.partition('.')[0] if '.' in module else None
+
+    result = set()
+    for value in probes(country):
+        try:
+            mod.validate(value)
+        except (InvalidFormat, InvalidLength):
+            continue
+        except Exception:
+            pass
+        result.add(signature(value))
+
+    # formats that accept other prefixes than their country code
+    # accept any
+    heads = {head for _, _, head in result} - {NO_PREFIX}
+    if heads and heads != {(country or '').upper()}:
+        result = {(cls, length, ANY_PREFIX if head else head)
+                  for cls, length, head in result}
+
+    for value in values:
+        if _covers(result, value):
+            continue
+        try:
+            mod.validate(value)
+        except Exception:
+            continue
+        return {UNCERTAIN}
+    return result
+
+
+def build_index() -> Dict[str, List[Signature]]:
+    '''Returns the signatures of every format (`UNCERTAIN` for formats
+    that probes don't cover). Imports every stdnum module.
+    '''
+    modules = formats()
+    values = sorted(corpus(set(modules.values())))
+    return {name: sorted(_signatures(module, values))
+            for name, module in modules.items()}
+
+
+def write_index(path: Path = INDEX) -> None:
+    data = dict(version=INDEX_VERSION,
+                stdnum=stdnum.__version__,
+                formats=build_index())
+    with open(path, 'w', encoding='utf-8') as fp:
+        json.dump(data, fp, separators=(',', ':'))
+        fp.write('\n')
+
+
+def load_index(path: Path = INDEX) -> Dict[str, List[Signature]]:
+    '''Returns the index, or an index that validates every format if
+    it's missing or was generated for another python-stdnum version
+    (building it takes seconds, see `update_stdnum_manifest`).
+    '''
+    try:
+        with open(path, encoding='utf-8') as fp:
+            data = json.load(fp)
+    except (OSError, ValueError):
+        data = dict()
+
+    if (data.get('version') != INDEX_VERSION
+            or data.get('stdnum') != stdnum.__version__):
+        log.warning('No signature index for python-stdnum %s, every format '
+                    'is validated (see pydentic.tools.'
+                    'update_stdnum_manifest)', stdnum.__version__)
+        return {name: [UNCERTAIN] for name in formats()}
+    return {name: [tuple(s) for s in signatures]
+            for name, signatures in data['formats'].items()}
+
+
+# detection
+
+class Profile(NamedTuple):
+    count:      int
+    types:      Counter[str]
+    undetected: int
+
+
+class Detector:
+    '''Detects formats with an index of signatures.
+    '''
+    def __init__(
+        self,
+        index: Optional[Dict[str, List[Signature]]] = None,
+    ) -> None:
+        if index is None:
+            index = load_index()
+        self._modules = formats()
+        self._validators = dict()  # type: Dict[str, Callable]
+        self._all = sorted(index)
+        self._index = defaultdict(list)  # type: Dict[Signature, List[str]]
+        for name, signatures in index.items():
+            for sig in signatures:
+                self._index[tuple(sig)].append(name)
+        self._uncertain = self._index.pop(UNCERTAIN, [])
+
+    def candidates(self, value: str) -> List[str]:
+        '''Returns the formats that the value could be, without
+        validating it.
+        '''
+        cls, length, head = signature(value)
+        if not length:
+            return []
+        if cls == 'other':
+            return self._all
+        names = self._index.get((cls, length, head), []) + self._uncertain
+        if head:
+            names = names + self._index.get((cls, length, ANY_PREFIX), [])
+        return names
+
+    def _validator(self, name: str) -> Callable:
+        try:
+            return self._validators[name]
+        except KeyError:
+            module = import_module(f'stdnum.{self._modules[name]}')
+            validator = self._validators[name] = module.validate
+            return validator
+
+    def detect(self, value: str, exhaustive: bool = False) -> List[str]:
+        '''Returns the formats the value is valid for. Every format is
+        validated if `exhaustive` (which gives the same result, slower).
+        '''
+        result = []
+        names = self._all if exhaustive else self.candidates(value)
+        for name in names:
+            try:
+                self._validator(name)(value)
+            except Exception:
+                continue
+            result.append(name)
+        return sorted(result)
+
+    def profile(
+        self,
+        values:  Iterable[str],
+        maxsize: int = 100_000,
+    ) -> Profile:
+        '''Returns how many values of the column match every format.
+        Results of repeated values are reused, up to `maxsize` distinct
+        values.
+        '''
+        count = undetected = 0
+        types = counter()  # type: Counter[str]
+        seen = dict()  # type: Dict[str, List[str]]
+        for value in values:
+            count += 1
+            try:
+                names = seen[value]
+            except KeyError:
+                if len(seen) >= maxsize:
+                    seen.clear()
+                names = seen[value] = self.detect(value)
+            except TypeError:
+                names = []
+            if names:
+                types.update(names)
+            else:
+                undetected += 1
+        return Profile(count, types, undetected)
+
+
+@lru_cache(maxsize=None)
+def detector() -> Detector:
+    return Detector()
+
+
+__all__ = ['Detector', 'Profile', 'build_index', 'detector', 'signature',
+           'write_index']
@@ -0,0 +1,179 @@
+'''
+Media types of files, by name and leading bytes.
+
+    >>> guess('photo.JPG')
+    MediaType(type='image', subtype='jpeg', suffix=None)
+    >>> guess(head=b'%PDF-1.7')
+    MediaType(type='application', subtype='pdf', suffix=None)
+
+The table of extensions and signatures is bundled (`media_types.json`).
+Extensions are looked up in a dict, and signatures in a trie of their
+bytes (`?` bytes in the table match any byte), so the leading bytes of a
+file are walked once instead of being compared with every signature.
+
+Signatures win over extensions, except for container formats, that
+non-text extensions narrow (e.g. a `.docx` file is an `application/zip`
+file).
+'''
+from typing import (Any, Dict, Iterable, Iterator, List, NamedTuple,
+                    Optional, Tuple, Union)
+from functools import lru_cache
+from pathlib import Path
+import json
+import os
+
+from .mime import MediaType
+
+TABLE = Path(__file__).with_name('media_types.json')
+
+#: key of the media type in a trie node (bytes are ints)
+KIND = -1
+
+#: key of the node of any byte
+ANY = None
+
+#: signature types that the extension of the file narrows
+CONTAINERS = frozenset(('application/gzip', 'application/msword',
+                        'application/xml', 'application/zip', 'audio/ogg',
+                        'video/mp4', 'video/x-matroska'))
+
+Node = Dict[Any, Any]
+
+Head = Union[bytes, bytearray, memoryview]
+
+
+class Index(NamedTuple):
+    extensions: Dict[str, MediaType]
+    magic:      Node
+    head_size:  int
+
+
+def _signature(hexstr: str) -> List[Optional[int]]:
+    return [None if hexstr[i:i + 2] == '??' else int(hexstr[i:i + 2], 16)
+            for i in range(0, len(hexstr), 2)]
+
+
+@lru_cache(maxsize=None)
+def index(path: Path = TABLE) -> Index:
+    '''Returns the index of the table (built once).
+    '''
+    with open(path, encoding='utf-8') as fp:
+        table = json.load(fp)
+
+    extensions = {ext: MediaType.from_str(value)
+                  for ext, value in table['extensions'].items()}
+
+    root = dict()  # type: Node
+    head_size = 0
+    for hexstr, value in table['magic']:
+        signature = _signature(hexstr)
+        node = root
+        for byte in signature:
+            node = node.setdefault(byte, dict())
+        node[KIND] = MediaType.from_str(value)
+        head_size = max(head_size, len(signature))
+
+    return Index(extensions, root, head_size)
+
+
+def by_extension(filename: Union[str, Path]) -> Optional[MediaType]:
+    '''Returns the media type of the (longest) extension of the file.
+    '''
+    extensions = index().extensions
+    name = os.path.basename(filename).lower()
+    dot = name.find('.', 1)
+    while dot != -1:
+        try:
+            return extensions[name[dot + 1:]]
+        except KeyError:
+            dot = name.find('.', dot + 1)
+    return None
+
+
+def by_signature(head: Head) -> Optional[MediaType]:
+    '''Returns the media type of the longest signature that the leading
+    bytes of a file match.
+    '''
+    result = None
+    nodes = [index().magic]
+    for byte in head:
+        matches = []
+        for node in nodes:
+            for key in (byte, ANY):
+                child = node.get(key)
+                if child is not None:
+                    result = child.get(KIND, result)
+                    matches.append(child)
+        if not matches:
+            break
+        nodes = matches
+    return result
+
+
+def _is_text(head: Head) -> bool:
+    head = bytes(head)
+    if b'\0' in head:
+        return False
+    try:
+        head.decode('utf-8')
+    except UnicodeDecodeError as e:
+        # a character cut at the end of the head
+        return (e.reason == 'unexpected end of data'
+                and e.start >= len(head) - 3)
+    return True
+
+
+def guess(
+    filename: Optional[Union[str, Path]] = None,
+    head:     Optional[Head] = None,
+) -> Optional[MediaType]:
+    '''Returns the media type of a file by its name and its leading
+    bytes (`index().head_size` bytes are enough), or `None` if it's
+    unknown. UTF-8 content of unknown type is `text/plain`.
+    '''
+    extension = by_extension(filename) if filename else None
+    if not head:
+        return extension
+
+    signature = by_signature(head)
+    if signature is None:
+        if extension is None and _is_text(head):
+            return MediaType.from_str('text/plain')
+        return extension
+    if (extension is not None and extension.type != 'text'
+            and str(signature) in CONTAINERS):
+        return extension
+    return signature
+
+
+def _files(paths: Iterable[Union[str, Path]]) -> Iterator[str]:
+    for path in paths:
+        if os.path.isdir(path):
+            for dirpath, _, filenames in os.walk(path):
+                for filename in sorted(filenames):
+                    yield os.path.join(dirpath, filename)
+        else:
+            yield os.fspath(path)
+
+
+def classify(
+    paths: Union[str, Path, Iterable[Union[str, Path]]],
+) -> Iterator[Tuple[str, Optional[MediaType]]]:
+    '''Yields the path and media type of the files of directory trees
+    (or of files). Only the leading bytes of each file are read, into a
+    reused buffer. Unreadable files are skipped.
+    '''
+    if isinstance(paths, (str, Path)):
+        paths = (paths,)
+    buffer = bytearray(index().head_size)
+    with memoryview(buffer) as view:
+        for path in _files(paths):
+            try:
+                with open(path, 'rb', buffering=0) as fp:
+                    size = fp.readinto(buffer)
+            except OSError:
+                continue
+            yield path, guess(path, view[:size])
+
+
+__all__ = ['by_extension', 'by_signature', 'classify', 'guess', 'index']
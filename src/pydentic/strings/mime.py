@@ -1,7 +1,13 @@
-from typing import NamedTuple, Optional, Dict
+from typing import (Any, Callable, Dict, Iterable, Iterator, List, Mapping,
+                    Match, NamedTuple, Optional, Tuple, Union)
+from types import MappingProxyType
 from enum import Enum
+import sys
 import re
 
+from ..core.cache import LruCache
+from ..core.instrumentation import instrumented
+from ..core.schema import plain_type
 from ..core.utils import parse_params
 
 # https://tools.ietf.org/html/rfc2045#section-5.1
@@ -57,7 +63,7 @@ def content_type_pattern(type: Optional[str] = None) -> str:
     OWS    = r'[ \t]*'
     TOKEN  = r'[A-Z0-9!#$%&\'*+.^_`|~-]+'
     QUOTED = r'\"(?:[^\"\\\\]|\\.)*\"'
-    PARAM  = f';{OWS}{TOKEN}=({TOKEN}|{QUOTED})'
+    PARAM  = f'{OWS};{OWS}{TOKEN}=({TOKEN}|{QUOTED})'
 
     return f'{mime_pattern(type)}(?P<params>({PARAM})*)'
 
@@ -66,7 +72,50 @@ def content_type_pattern(type: Optional[str] = None) -> str:
 
 CTYPE = re.compile(content_type_pattern(), re.I)
 
+#: parsed headers, by class and raw string. HTTP services see a few
+#: distinct values many times.
+CACHE = LruCache(maxsize=1_024)
 
+#: interned media types (up to `MAX_INTERNED`)
+INTERNED = dict()  # type: Dict[MediaType, MediaType]
+
+MAX_INTERNED = 4_096
+
+
+TOKEN = re.compile(r'[A-Z0-9!#$%&\'*+.^_`|~-]+', re.I)
+
+
+def format_param(param: Tuple[str, Optional[str]]) -> str:
+    key, value = param
+    if value is None:
+        return key
+    if not TOKEN.fullmatch(value):
+        value = '"{}"'.format(re.sub(r'(["\\])', r'\\\1', value))
+    return f'{key}={value}'
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    return sys.intern(value.lower()) if value else None
+
+
+def intern_media_type(
+    type:    str,
+    subtype: str,
+    suffix:  Optional[str],
+) -> 'MediaType':
+    '''Returns the shared instance of the (lowercased) media type, so
+    equal media types are usually identical.
+    '''
+    media_type = MediaType(_intern(type), _intern(subtype), _intern(suffix))
+    try:
+        return INTERNED[media_type]
+    except KeyError:
+        if len(INTERNED) < MAX_INTERNED:
+            INTERNED[media_type] = media_type
+        return media_type
+
+
+@plain_type(str)
 class MediaType(NamedTuple):
     type:    str
     subtype: str
@@ -78,36 +127,284 @@ def __str__(self) -> str:
 
     @classmethod
     def from_str(cls, string: str) -> 'MediaType':
+        return CACHE.call(cls._parse, (cls, string), string)
+
+    @classmethod
+    def _parse(cls, string: str) -> 'MediaType':
         try:
-            return cls(**MIME.match(string).groupdict())
-        except AttributeError:
-            raise ValueError(string)
+            mtype = MIME.match(string).groupdict()
+        except (AttributeError, TypeError):
+            raise ValueError(string) from None
+        return intern_media_type(**mtype)
+
+    @classmethod
+    def guess(
+        cls,
+        filename: Optional[str] = None,
+        head:     Optional[bytes] = None,
+    ) -> Optional['MediaType']:
+        '''Returns the media type of a file by its name and leading bytes
+        (see `pydentic.strings.magic`), or `None` if it's unknown.
+        '''
+        from .magic import guess
+        return guess(filename, head)
 
+    @classmethod
+    def __get_validators__(cls) -> Iterator[Callable]:
+        yield cls.validate
+
+    @classmethod
+    def validate(cls, v: Any) -> 'MediaType':
+        return v if isinstance(v, cls) else cls.from_str(v)
+
+    @classmethod
+    def __modify_schema__(cls, field_schema: Dict[str, Any]) -> None:
+        field_schema.update(type='string')
 
+
+@plain_type(str)
 class ContentType(NamedTuple):
     type:    str
     subtype: str
     suffix:  Optional[str]
-    params:  Optional[Dict[str, str]]
+    params:  Optional[Mapping[str, str]]
 
     def __str__(self) -> str:
         suffix = f'+{self.suffix}' if self.suffix else ''
         m_type = f'{self.type}/{self.subtype}{suffix}'
-        params = [f'{k}={v}' for k, v in (self.params or {}).items()]
+        params = map(format_param, (self.params or {}).items())
         return ';'.join((m_type, *params))
 
     @property
     def media_type(self) -> MediaType:
-        return MediaType(type=self.type, subtype=self.subtype, suffix=self.suffix)
+        return intern_media_type(self.type, self.subtype, self.suffix)
 
     @classmethod
+    @instrumented
     def from_str(cls, string: str) -> 'ContentType':
+        '''Parses a header value. Results are cached (and shared, so
+        `params` are read-only).
+        '''
+        return CACHE.call(cls._parse, (cls, string), string)
+
+    @classmethod
+    def _parse(cls, string: str) -> 'ContentType':
         try:
             ctype = CTYPE.match(string).groupdict()
-        except AttributeError:
+        except (AttributeError, TypeError):
+            raise ValueError(string) from None
+
+        media_type = intern_media_type(ctype['type'], ctype['subtype'],
+                                       ctype['suffix'])
+        params = parse_params(ctype['params'], whitespace=True)
+        return cls(*media_type, params)
+
+    @classmethod
+    def __get_validators__(cls) -> Iterator[Callable]:
+        yield cls.validate
+
+    @classmethod
+    def validate(cls, v: Any) -> 'ContentType':
+        return v if isinstance(v, cls) else cls.from_str(v)
+
+    @classmethod
+    def __modify_schema__(cls, field_schema: Dict[str, Any]) -> None:
+        field_schema.update(type='string')
+
+
+# content negotiation
+# https://tools.ietf.org/html/rfc7231#section-5.3.2
+
+def accept_patterns() -> Tuple[str, str]:
+    '''Returns the patterns of a media range of an `Accept` header, and
+    of its parameters.
+    '''
+    OWS    = r'[ \t]*'
+    TOKEN  = r'[A-Z0-9!#$%&\'*+.^_`|~-]+'
+    QUOTED = r'\"(?:[^\"\\\\]|\\.)*\"'
+    VALUE  = f'{TOKEN}|{QUOTED}'
+    PARAM  = f'{OWS};{OWS}(?P<key>{TOKEN})=(?P<value>{VALUE})'
+    RANGE  = (f'{OWS}(?P<type>{TOKEN})/(?P<subtype>{TOKEN})'
+              f'(?P<params>(?:{OWS};{OWS}{TOKEN}=(?:{VALUE}))*)'
+              fr'{OWS}(?:,|\Z)')
+    return RANGE, PARAM
+
+
+_range, _param = accept_patterns()
+
+MEDIA_RANGE = re.compile(_range, re.I)
+
+RANGE_PARAM = re.compile(_param, re.I)
+
+QVALUE = re.compile(r'0(\.[0-9]{0,3})?|1(\.0{0,3})?')
+
+WILDCARD = '*'
+
+
+class MediaRange(NamedTuple):
+    type:    str
+    subtype: str
+    suffix:  Optional[str]
+    params:  Optional[Mapping[str, str]]
+    q:       float
+
+    def __str__(self) -> str:
+        suffix = f'+{self.suffix}' if self.suffix else ''
+        params = list(map(format_param, (self.params or {}).items()))
+        if self.q != 1:
+            params.append(f'q={self.q:g}')
+        return ';'.join((f'{self.type}/{self.subtype}{suffix}', *params))
+
+    @classmethod
+    def from_match(cls, match: Match) -> 'MediaRange':
+        type, subtype = match['type'].lower(), match['subtype'].lower()
+        if type == WILDCARD and subtype != WILDCARD:
+            raise ValueError(match.string)
+
+        suffix = None
+        if '+' in subtype:
+            subtype, _, suffix = subtype.rpartition('+')
+
+        q = 1.0
+        params = dict()  # type: Dict[str, str]
+        for param in RANGE_PARAM.finditer(match['params']):
+            key = param['key'].lower()
+            if key == 'q':
+                # accept-ext params follow the weight
+                if not QVALUE.fullmatch(param['value']):
+                    raise ValueError(match.string)
+                q = float(param['value'])
+                break
+            params[key] = param['value']
+
+        return cls(_intern(type), _intern(subtype), _intern(suffix),
+                   MappingProxyType(params) if params else None, q)
+
+
+@plain_type(str)
+class Accept(NamedTuple):
+    '''Media ranges of an `Accept` header.
+
+    >>> Accept.from_str('text/html, */*;q=0.1').ranges[1]
+    MediaRange(type='*', subtype='*', suffix=None, params=None, q=0.1)
+    '''
+    ranges: Tuple[MediaRange, ...]
+
+    def __str__(self) -> str:
+        return ', '.join(map(str, self.ranges))
+
+    @classmethod
+    def from_str(cls, string: str) -> 'Accept':
+        return CACHE.call(cls._parse, (cls, string), string)
+
+    @classmethod
+    def _parse(cls, string: str) -> 'Accept':
+        if not isinstance(string, str):
             raise ValueError(string)
 
-        return cls(type=ctype['type'].lower(),
-                   subtype=ctype['subtype'].lower(),
-                   suffix=ctype['suffix'].lower() if ctype['suffix'] else None,
-                   params=parse_params(ctype['params']))
+        ranges = []  # type: List[MediaRange]
+        pos, end = 0, len(string)
+        while pos < end:
+            # empty list elements are allowed
+            if string[pos] in ' \t,':
+                pos += 1
+                continue
+            match = MEDIA_RANGE.match(string, pos)
+            if match is None:
+                raise ValueError(string)
+            ranges.append(MediaRange.from_match(match))
+            pos = match.end()
+        return cls(tuple(ranges))
+
+    @classmethod
+    def __get_validators__(cls) -> Iterator[Callable]:
+        yield cls.validate
+
+    @classmethod
+    def validate(cls, v: Any) -> 'Accept':
+        return v if isinstance(v, cls) else cls.from_str(v)
+
+    @classmethod
+    def __modify_schema__(cls, field_schema: Dict[str, Any]) -> None:
+        field_schema.update(type='string')
+
+
+class Negotiator:
+    '''Picks the best of the media types a server offers for `Accept`
+    headers.
+
+    >>> negotiator = Negotiator(['application/json', 'text/html'])
+    >>> str(negotiator.best_match('text/*;q=0.9, application/*;q=0.5'))
+    'text/html'
+
+    Offers are indexed by media type, type, and type and suffix, so a
+    range only visits the offers it matches. The quality of an offer is
+    the `q` of the most specific range that matches it, and ties are won
+    by the first offer. Offers have no parameters, so ranges with
+    parameters (`text/html;level=1`) don't match them.
+
+    Results are cached by header.
+    '''
+    def __init__(
+        self,
+        offers:  Iterable[Union[str, MediaType]],
+        maxsize: int = 1_024,
+    ) -> None:
+        self.offers = tuple(map(MediaType.validate, offers))
+        self._exact    = dict()  # type: Dict[MediaType, List[int]]
+        self._types    = dict()  # type: Dict[str, List[int]]
+        self._suffixes = dict()  # type: Dict[Tuple[str, str], List[int]]
+        for i, offer in enumerate(self.offers):
+            self._exact.setdefault(offer, []).append(i)
+            self._types.setdefault(offer.type, []).append(i)
+            if offer.suffix:
+                key = (offer.type, offer.suffix)
+                self._suffixes.setdefault(key, []).append(i)
+        self._all   = list(range(len(self.offers)))
+        self._cache = LruCache(maxsize=maxsize)
+
+    def _matches(self, media_range: MediaRange) -> Tuple[int, List[int]]:
+        '''Returns the specificity of the range, and the offers it
+        matches.
+        '''
+        if media_range.params:
+            return 0, []
+        if media_range.type == WILDCARD:
+            return 0, self._all
+        if media_range.subtype == WILDCARD:
+            if media_range.suffix:
+                key = (media_range.type, media_range.suffix)
+                return 2, self._suffixes.get(key, [])
+            return 1, self._types.get(media_range.type, [])
+        key = MediaType(*media_range[:3])
+        return 3, self._exact.get(key, [])
+
+    def best_match(self, header: Optional[str]) -> Optional[MediaType]:
+        '''Returns the offer with the highest quality for the `Accept`
+        header, or `None` if none is acceptable. Without header, any
+        offer is, and so it is with a header that can't be parsed (as
+        RFC 9110 section 12.5.1 allows).
+        '''
+        if not header or header.isspace():
+            return self.offers[0] if self.offers else None
+        return self._cache.call(self._best_match, header, header)
+
+    def _best_match(self, header: str) -> Optional[MediaType]:
+        # offer -> (specificity, q) of its most specific range
+        qualities = dict()  # type: Dict[int, Tuple[int, float]]
+        try:
+            ranges = Accept.from_str(header).ranges
+        except ValueError:
+            return self.offers[0] if self.offers else None
+        for media_range in ranges:
+            specificity, offers = self._matches(media_range)
+            for i in offers:
+                current = qualities.get(i)
+                if current is None or current[0] < specificity:
+                    qualities[i] = (specificity, media_range.q)
+
+        best, best_q = None, 0.0
+        for i, (_, q) in qualities.items():
+            if q > best_q or q == best_q and best is not None and i < best:
+                best, best_q = i, q
+        return None if best is None else self.offers[best]
@@ -0,0 +1,116 @@
+'''
+Registry of the python-stdnum formats exposed in `pydentic.strings`.
+
+The registry is read from a manifest generated for a given python-stdnum
+version (see `write_manifest`), so neither the stdnum package directory
+nor its modules are touched at import. If the installed version doesn't
+match the manifest, formats are discovered scanning the stdnum package.
+'''
+from typing import Optional, Dict, Tuple, Union, Any
+from importlib import import_module
+from pkgutil import iter_modules
+from functools import partial
+from pathlib import Path
+import json
+import re
+
+import stdnum
+
+#: stdnum module and first line of its docstring (if known)
+Format = Tuple[str, Optional[str]]
+
+#: packages map to their formats, or to `None` if not discovered yet
+Registry = Dict[str, Union[Format, Dict[str, Format], None]]
+
+MANIFEST = Path(__file__).with_name('stdnum.json')
+
+MANIFEST_VERSION = 1
+
+TERM = ('account', 'catastral', 'code', 'id', 'fiscale',
+        'kimlik', 'note', 'numero', 'nummer')
+
+# capitalize the second term in compund words
+capitalize = partial(re.compile('({})$'.format('|'.join(TERM))).sub,
+                     lambda m: m.group(0).capitalize())
+
+EXCLUDED = (
+    # iso9362 deprecated in favor of bic
+    'exceptions', 'numdb', 'util', 'iso9362',
+    # algorithms
+    'luhn', 'damn', 'verhoeff',
+)
+
+
+def is_package(entry: Any) -> bool:
+    return entry is None or isinstance(entry, dict)
+
+
+def docline(module: str) -> str:
+    '''Returns the first line of a stdnum module docstring.
+    '''
+    doc = import_module(f'stdnum.{module}').__doc__
+    return doc.strip().splitlines()[0].rstrip('.')
+
+
+def discover(package: Optional[str] = None) -> Registry:
+    '''Scans the stdnum package (or one of its subpackages) for formats.
+    Subpackages aren't traversed.
+    '''
+    pkgdir, = stdnum.__path__
+    if package is not None:
+        pkgdir = str(Path(pkgdir, package))
+
+    formats = dict()
+    for _, mod, ispkg in iter_modules([pkgdir]):
+        if package is not None:
+            name = capitalize(mod.capitalize())
+            formats[name] = (f'{package}.{mod}', None)
+        elif ispkg:
+            formats[mod] = None
+        elif not mod.startswith('mod_') and mod not in EXCLUDED:
+            formats[mod.capitalize()] = (mod, None)
+    return formats
+
+
+def build_manifest() -> Dict[str, Any]:
+    '''Discovers every format, importing its module to read the
+    docstring.
+    '''
+    formats = discover()
+    for name, entry in formats.items():
+        if entry is None:
+            formats[name] = {n: (mod, docline(mod))
+                             for n, (mod, _) in discover(name).items()}
+        else:
+            formats[name] = (entry[0], docline(entry[0]))
+
+    return dict(version=MANIFEST_VERSION,
+                stdnum=stdnum.__version__,
+                formats=formats)
+
+
+def write_manifest(path: Path = MANIFEST) -> None:
+    with open(path, 'w', encoding='utf-8') as fp:
+        json.dump(build_manifest(), fp, indent=1, ensure_ascii=False)
+        fp.write('\n')
+
+
+def load_manifest(path: Path = MANIFEST) -> Optional[Registry]:
+    '''Returns the formats in the manifest, or `None` if it's missing or
+    was generated for another python-stdnum version.
+    '''
+    try:
+        with open(path, encoding='utf-8') as fp:
+            manifest = json.load(fp)
+    except (OSError, ValueError):
+        return None
+
+    if (manifest.get('version') != MANIFEST_VERSION
+            or manifest.get('stdnum') != stdnum.__version__):
+        return None
+
+    return manifest['formats']
+
+
+def load() -> Registry:
+    return load_manifest() or discover()
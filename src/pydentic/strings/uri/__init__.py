@@ -1,3 +1,4 @@
-from .base import GeoUri
+from .base import AnyUri, GeoUri
+from .dispatch import UriUnion
 from .urn import AnyUrn, IssnUrn, HandleUrn, DoiUri
 from .network import StunUri, TurnUri, WebSocketUri
@@ -1,10 +1,19 @@
-from typing import Type, TypeVar, NamedTuple, Optional, Pattern, Dict
+from typing import (Any, Type, TypeVar, NamedTuple, Optional, Pattern, Dict,
+                    Iterable, Iterator, Callable, Match, Tuple)
+from functools import lru_cache
 from os import PathLike
 import logging
 import re
 
+from ...core.cache import DEFAULT_MAXSIZE, Cached
+from ...core.instrumentation import instrumented
+from ...core.schema import json_schema, pattern_schema
 from ...exceptions import ContentError
 from .grammar import Grammar, Rule
+from .scanner import scan
+from .dispatch import dispatcher, register
+from .normalization import (DEFAULT_PORTS, normalize_authority,
+                            normalize_pct, remove_dot_segments)
 from ...core.utils import parse_params, unname_groups
 
 T = TypeVar('T')
@@ -37,6 +46,20 @@ def uri_pattern(
 
 URI = re.compile(uri_pattern())
 
+#: engines of generic URIs (`ParsedUri.from_str` and `AnyUri`):
+#:   regex: RFC 3986 Appendix B regex. Lenient.
+#:   scanner: strict RFC 3986 scanner.
+ENGINES = ('regex', 'scanner')
+
+ENGINE = 'regex'
+
+
+def set_engine(name: str) -> None:
+    global ENGINE
+    if name not in ENGINES:
+        raise ValueError(f'unknown engine {name!r}')
+    ENGINE = name
+
 
 class ParsedUri(NamedTuple):
     scheme:    Optional[str] = None
@@ -47,16 +70,37 @@ class ParsedUri(NamedTuple):
 
     @classmethod
     def from_str(cls, string: str, pattern: Pattern = URI) -> 'ParsedUri':
+        if pattern is URI and ENGINE == 'scanner':
+            return cls.from_spans(string, scan(string))
+
         try:
             match = pattern.match(string).groupdict()
         except AttributeError:
             raise ValueError(string) from None
 
-        if 'scheme' in match:
+        if match.get('scheme'):
             match['scheme'] = match['scheme'].lower()
 
         return cls(**match)
 
+    @classmethod
+    def from_spans(cls, string: str, spans: Tuple[int, ...]) -> 'ParsedUri':
+        '''Returns the components of the `(start, end)` spans of the
+        scheme, authority, path, query and fragment (see `scanner.scan`).
+        '''
+        parts = [string[spans[i]:spans[i + 1]] if spans[i] != -1 else None
+                 for i in range(0, 10, 2)]
+        if parts[0] is not None:
+            parts[0] = parts[0].lower()
+        return cls(*parts)
+
+    def normalize(self) -> 'ParsedUri':
+        '''Returns the `normalized`__ URI (results are cached).
+
+        __ https://tools.ietf.org/html/rfc3986#section-6
+        '''
+        return _normalize(self)
+
     def __str__(self) -> str:
         # https://tools.ietf.org/html/rfc3986#section-5.3
 
@@ -75,34 +119,142 @@ def __str__(self) -> str:
         return ''.join(result)
 
 
-class AnyUri(str):
+@lru_cache(maxsize=DEFAULT_MAXSIZE)
+def _normalize(uri: ParsedUri) -> ParsedUri:
+    scheme = uri.scheme.lower() if uri.scheme else uri.scheme
+    authority = uri.authority
+    path = remove_dot_segments(normalize_pct(uri.path))
+    if authority is not None:
+        authority = normalize_authority(authority, scheme)
+        if not path and scheme in DEFAULT_PORTS:
+            path = '/'
+    return ParsedUri(scheme, authority, path,
+                     normalize_pct(uri.query), normalize_pct(uri.fragment))
+
+
+class AnyUri(Cached, str):
+    '''URI string. Components (`uri`, and the pattern's other named
+    groups, e.g. `host`) are set on first access, so validated values
+    that are only used as strings cost about as much as plain strings.
+    '''
+    _pattern = URI
+    _scheme  = None  # type: Optional[str]
+
     def __init_subclass__(cls, **kwargs: str):
-        cls._pattern = re.compile(uri_pattern(**kwargs))
+        # subclasses without components inherit the pattern
+        if kwargs:
+            cls._pattern = re.compile(uri_pattern(**kwargs))
+        if 'scheme' in kwargs:
+            cls._scheme = kwargs['scheme']
+            register(cls, cls._scheme)
 
+    @instrumented
     def __new__(cls: Type[T], string: str, **kwargs) -> T:
-        try:
-            parsed = cls._pattern.match(string).groupdict()
-        except AttributeError:
-            raise ValueError(string) from None
+        if cls._pattern is URI and ENGINE == 'scanner':
+            scan(string)
+            match = None
+        else:
+            match = cls._pattern.match(string)
+            if match is None:
+                raise ValueError(string)
+        cls._check(string, match)
+        return super().__new__(cls, string)
+
+    @classmethod
+    def _check(cls, string: str, match: Optional[Match]) -> None:
+        '''Validates what the pattern can't. `match` is `None` for the
+        scanner engine.
+        '''
 
-        self = super().__new__(cls, string)
+    def _components(self, attrs: Dict[str, Any]) -> None:
+        '''Updates the components (e.g. default values) before they're
+        set.
+        '''
+
+    def _materialize(self) -> None:
+        if self._pattern is URI:
+            self.__dict__.setdefault('uri', ParsedUri.from_str(self))
+            return
+
+        parsed = self._pattern.match(self).groupdict()
 
         # set pattern's non-URI named groups as instance attributes
         #   e.g. `nid` and `nss` in AnyUrn
-        for field in list(parsed):
-            if field not in ParsedUri._fields:
-                setattr(self, field, parsed.pop(field))
-        if 'scheme' in parsed:
+        attrs = {field: parsed.pop(field) for field in list(parsed)
+                 if field not in ParsedUri._fields}
+        if parsed.get('scheme'):
             parsed['scheme'] = parsed['scheme'].lower()
-        self.uri = ParsedUri(**parsed)
+        attrs['uri'] = ParsedUri(**parsed)
+        self._components(attrs)
+
+        # attributes set by subclasses' `__init__` take precedence
+        for name, value in attrs.items():
+            self.__dict__.setdefault(name, value)
+
+    def __getattr__(self, name: str) -> Any:
+        if not name.startswith('_') and 'uri' not in self.__dict__:
+            self._materialize()
+            if name in self.__dict__:
+                return self.__dict__[name]
+        raise AttributeError(
+            f'{type(self).__name__!r} object has no attribute {name!r}')
+
+    @classmethod
+    def parse(cls: Type[T], string: str) -> T:
+        '''Validates the string with the registered subclass of its
+        scheme, or with this class if there's none.
+        '''
+        try:
+            subclass = dispatcher(cls).get(string)
+        except TypeError:
+            subclass = None
+        return (subclass or cls).validate(string)
+
+    def canonical_key(self) -> str:
+        '''Returns the normalized URI, e.g. to deduplicate URIs that
+        only differ in case, default port, percent-encoding or dot
+        segments.
+        '''
+        try:
+            return self.__dict__['_canonical_key']
+        except KeyError:
+            key = str(self.uri.normalize())
+            self.__dict__['_canonical_key'] = key
+            return key
+
+    @classmethod
+    def canonical_keys(cls, values: Iterable[str]) -> Iterator[str]:
+        '''Validates the values and yields their canonical keys.
+        '''
+        for v in values:
+            uri = v if isinstance(v, cls) else cls.validate(v)
+            yield uri.canonical_key()
 
-        return self
+    @classmethod
+    def __get_validators__(cls) -> Iterator[Callable]:
+        yield cls.validate
+
+    @classmethod
+    def validate(cls: Type[T], v: str) -> T:
+        return cls._cached(cls, v)
 
     @classmethod
     def __modify_schema__(cls, field_schema) -> None:
         pattern = unname_groups(cls._pattern.pattern)
         field_schema.update(type='string', pattern=pattern)
 
+    @classmethod
+    def __get_pydantic_core_schema__(cls, source: Any, handler: Any) -> Any:
+        return pattern_schema(cls._pattern, cls.validate)
+
+    @classmethod
+    def __get_pydantic_json_schema__(
+        cls,
+        core_schema: Any,
+        handler:     Any,
+    ) -> Dict[str, Any]:
+        return json_schema(cls)
+
 
 class SqliteUri(PathLike, AnyUri, scheme='sqlite', authority=''):
 
@@ -141,14 +293,18 @@ class GeoUri(
     __ https://tools.ietf.org/html/rfc5870
     '''
 
-    def __init__(self, string: str) -> None:
-        self.crs = self.crs or 'wsg84'
-        if self.params:
-            self.params = parse_params(self.params)
-            if 'crs' in self.params or 'u' in self.params:
-                err = ("'crs' and 'u' can only appear once, in that order, "
-                       "and before other parameters")
-                raise ContentError(string, err)
+    @classmethod
+    def _check(cls, string: str, match: Match) -> None:
+        params = parse_params(match['params'])
+        if params and ('crs' in params or 'u' in params):
+            err = ("'crs' and 'u' can only appear once, in that order, "
+                   "and before other parameters")
+            raise ContentError(string, err)
+
+    def _components(self, attrs: Dict[str, Any]) -> None:
+        attrs['crs'] = attrs['crs'] or 'wsg84'
+        if attrs['params']:
+            attrs['params'] = parse_params(attrs['params'])
 
     def __geo_interface__(self) -> Dict:
         if self.alt is None:
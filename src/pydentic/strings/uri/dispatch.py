@@ -0,0 +1,127 @@
+'''
+Dispatch of URIs to the `AnyUri` subclass of their scheme.
+
+    AnyUri.parse('geo:48.2010,16.3695')  # GeoUri
+
+    class Model(BaseModel):
+        uri: UriUnion[GeoUri, StunUri, WebSocketUri]
+
+A single match of the schemes of all the classes picks the class that
+validates the value, instead of trying every class in turn.
+'''
+from typing import (TYPE_CHECKING, Any, Callable, Dict, Iterable, Iterator,
+                    Optional, Sequence, Tuple, Type, Union)
+import re
+
+from ...core.schema import plain_type
+from ...exceptions import FormatError
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .base import AnyUri
+
+#: scheme pattern -> class. The first class of a scheme is kept, so
+#: subclasses that narrow a scheme (e.g. URN namespaces) don't take over.
+REGISTRY = dict()  # type: Dict[str, Type[AnyUri]]
+
+#: dispatchers of `AnyUri.parse`, by base class
+DISPATCHERS = dict()  # type: Dict[type, SchemeDispatcher]
+
+# capturing groups of scheme patterns, e.g. `socks(4|5)`
+GROUP = re.compile(r'(?<!\\)\((?!\?)')
+
+
+def register(cls: Type['AnyUri'], scheme: str) -> None:
+    REGISTRY.setdefault(scheme, cls)
+    DISPATCHERS.clear()
+
+
+class SchemeDispatcher:
+    '''Picks the class of a URI by its scheme.
+    '''
+    def __init__(self, classes: Iterable[Tuple[str, Type['AnyUri']]]) -> None:
+        self.classes = dict()  # type: Dict[str, Type[AnyUri]]
+        patterns = []
+        for i, (scheme, cls) in enumerate(classes):
+            name = f'_{i}'
+            self.classes[name] = cls
+            patterns.append(f'(?P<{name}>{GROUP.sub("(?:", scheme)}):')
+        self._pattern = re.compile('(?i:{})'.format('|'.join(patterns)))
+
+    @classmethod
+    def of(cls, classes: Sequence[Type['AnyUri']]) -> 'SchemeDispatcher':
+        '''Returns the dispatcher of the classes (the first one wins if
+        several have the same scheme).
+        '''
+        for c in classes:
+            if c._scheme is None:
+                raise TypeError(f'{c.__name__} has no scheme')
+        return cls((c._scheme, c) for c in classes)
+
+    def get(self, string: str) -> Optional[Type['AnyUri']]:
+        match = self._pattern.match(string)
+        if match is None:
+            return None
+        return self.classes[match.lastgroup]
+
+    def parse(self, string: str) -> 'AnyUri':
+        try:
+            cls = self.get(string)
+        except TypeError:
+            cls = None
+        if cls is None:
+            raise FormatError(string, 'unknown scheme')
+        return cls.validate(string)
+
+
+def dispatcher(base: Type['AnyUri']) -> SchemeDispatcher:
+    '''Returns the dispatcher of the registered subclasses of `base`.
+    '''
+    try:
+        return DISPATCHERS[base]
+    except KeyError:
+        result = DISPATCHERS[base] = SchemeDispatcher(
+            (scheme, cls) for scheme, cls in REGISTRY.items()
+            if issubclass(cls, base))
+        return result
+
+
+@plain_type()
+class UriUnion:
+    '''Pydantic type of URIs of any of the classes, dispatched by
+    scheme.
+    '''
+    _classes    = ()    # type: Tuple[Type[AnyUri], ...]
+    _dispatcher = None  # type: Optional[SchemeDispatcher]
+
+    def __class_getitem__(
+        cls,
+        classes: Union[Type['AnyUri'], Tuple[Type['AnyUri'], ...]],
+    ) -> type:
+        if not isinstance(classes, tuple):
+            classes = (classes,)
+        name = 'UriUnion[{}]'.format(', '.join(c.__name__ for c in classes))
+        dispatcher = SchemeDispatcher.of(classes)
+        return type(name, (cls,), dict(_classes=classes,
+                                       _dispatcher=dispatcher))
+
+    @classmethod
+    def __get_validators__(cls) -> Iterator[Callable]:
+        yield cls.validate
+
+    @classmethod
+    def validate(cls, v: Any) -> 'AnyUri':
+        if isinstance(v, cls._classes):
+            return v
+        return cls._dispatcher.parse(v)
+
+    @classmethod
+    def __modify_schema__(cls, field_schema: Dict[str, Any]) -> None:
+        schemas = []
+        for c in cls._classes:
+            schema = dict()  # type: Dict[str, Any]
+            c.__modify_schema__(schema)
+            schemas.append(schema)
+        field_schema.update(anyOf=schemas)
+
+
+__all__ = ['SchemeDispatcher', 'UriUnion', 'dispatcher', 'register']
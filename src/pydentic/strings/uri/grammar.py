@@ -2,7 +2,13 @@
 import re
 
 
-class Grammar(str, Enum):
+class StrEnum(str, Enum):
+    # format as the value (Python 3.11 formats members as `Class.NAME`)
+    __str__    = str.__str__
+    __format__ = str.__format__
+
+
+class Grammar(StrEnum):
     ALPHANUM    = '0-9a-zA-Z'
     HEXDIG      = '0-9a-fA-F'
     PNUM        = r'\d+(\.\d+)?'
@@ -11,7 +17,7 @@ class Grammar(str, Enum):
     PCT_ENCODED = f'%[{HEXDIG}][{HEXDIG}]'
 
 
-class Rule(str, Enum):
+class Rule(StrEnum):
     HOSTPORT     = r'(?P<host>[^/?#:]+)(?:\:(?P<port>\d+))?'
     # FIXME: remove lookbehinds
     #   https://json-schema.org/understanding-json-schema/reference/regular_expressions.html
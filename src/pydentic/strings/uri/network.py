@@ -1,4 +1,7 @@
+from typing import Any, Dict, Match
+
 from .base import AnyUri, Rule
+from ...core.utils import parse_params
 
 
 class StunUri(
@@ -20,9 +23,10 @@ class StunUri(
     def secure(self) -> bool:
         return self.uri.scheme == 'stuns'
 
-    def __init__(self, string):
-        if not self.port:
-            self.port = '5349' if self.secure else '3478'
+    def _components(self, attrs: Dict[str, Any]) -> None:
+        if not attrs['port']:
+            secure = attrs['uri'].scheme == 'stuns'
+            attrs['port'] = '5349' if secure else '3478'
 
     def __str__(self) -> str:
         return f'{self.uri.scheme}:{self.host}:{self.port}'
@@ -47,13 +51,16 @@ class TurnUri(
     def secure(self) -> bool:
         return self.uri.scheme == 'turns'
 
-    def __init__(self, string):
-        if self.query:
-            self.query = {k.lower(): v for k, v in self.query.items()}
-            if list(self.keys()) != ['transport']:
-                # TODO: set in subclass params
-                raise ValueError("no param other than 'transport' is allowed")
-            self.transport = self.query['transport']
+    @classmethod
+    def _check(cls, string: str, match: Match) -> None:
+        query = parse_params(match['query'], sep='&')
+        if query and list(query) != ['transport']:
+            # TODO: set in subclass params
+            raise ValueError("no param other than 'transport' is allowed")
+
+    def _components(self, attrs: Dict[str, Any]) -> None:
+        query = parse_params(attrs['uri'].query, sep='&')
+        attrs['transport'] = query['transport'] if query else None
 
 
 # TODO
@@ -90,9 +97,10 @@ class WebSocketUri(
 
     __ https://tools.ietf.org/html/rfc6455
     '''
-    def __init__(self, string):
-        if self.port is None:
-            self.port = '443' if self.secure else '80'
+    def _components(self, attrs: Dict[str, Any]) -> None:
+        if attrs['port'] is None:
+            secure = attrs['uri'].scheme == 'wss'
+            attrs['port'] = '443' if secure else '80'
 
     @property
     def secure(self) -> bool:
@@ -0,0 +1,121 @@
+'''
+`URI normalization`__: syntax-based (case, percent-encoding and path
+segments) and scheme-based (default ports and empty paths).
+
+    >>> remove_dot_segments('/a/b/c/./../../g')
+    '/a/g'
+    >>> normalize_pct('%7euser%2fdir')
+    '~user%2Fdir'
+
+__ https://tools.ietf.org/html/rfc3986#section-6
+'''
+from typing import List, Match, Optional
+import re
+
+UNRESERVED = frozenset('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ'
+                       '0123456789-._~')
+
+#: ports that are omitted in normalized URIs
+DEFAULT_PORTS = {
+    'ftp':   '21',
+    'http':  '80',
+    'https': '443',
+    'ws':    '80',
+    'wss':   '443',
+}
+
+PCT_ENCODED = re.compile('%([0-9A-Fa-f]{2})')
+
+
+def _pct(match: Match) -> str:
+    char = chr(int(match[1], 16))
+    return char if char in UNRESERVED else match[0].upper()
+
+
+def normalize_pct(string: Optional[str]) -> Optional[str]:
+    '''Decodes percent-encoded unreserved characters, and uppercases the
+    other percent-encodings.
+    '''
+    if not string or '%' not in string:
+        return string
+    return PCT_ENCODED.sub(_pct, string)
+
+
+def _remove_dot_segment(path: str, output: List[str]) -> Optional[str]:
+    '''Returns the path without its leading dot segment (steps A to D
+    of the algorithm), or `None` if it doesn't start with one.
+    '''
+    if path.startswith(('../', './')):
+        return path[path.index('/') + 1:]
+    if path.startswith('/./') or path == '/.':
+        return '/' + path[3:]
+    if path.startswith('/../') or path == '/..':
+        if output:
+            output.pop()
+        return '/' + path[4:]
+    if path in ('.', '..'):
+        return ''
+    return None
+
+
+def remove_dot_segments(path: str) -> str:
+    '''`Remove dot segments`__ of the path.
+
+    __ https://tools.ietf.org/html/rfc3986#section-5.2.4
+    '''
+    if '/.' not in path and not path.startswith('.'):
+        return path
+
+    output = []  # type: List[str]
+    while path:
+        rest = _remove_dot_segment(path, output)
+        if rest is None:
+            # step E: move the first segment to the output
+            end = path.find('/', 1)
+            if end == -1:
+                end = len(path)
+            output.append(path[:end])
+            rest = path[end:]
+        path = rest
+    return ''.join(output)
+
+
+def _pct_host(match: Match) -> str:
+    char = chr(int(match[1], 16))
+    return char.lower() if char in UNRESERVED else match[0].upper()
+
+
+def normalize_host(host: str) -> str:
+    '''Lowercases the host, and normalizes its percent-encodings (see
+    `normalize_pct`).
+
+    >>> normalize_host('Ex%c3%a9%41.COM')
+    'ex%C3%A9a.com'
+    '''
+    host = host.lower()
+    if '%' not in host:
+        return host
+    return PCT_ENCODED.sub(_pct_host, host)
+
+
+def normalize_authority(authority: str, scheme: Optional[str]) -> str:
+    '''Lowercases the host, and removes empty and default ports.
+    '''
+    userinfo, at, hostport = authority.rpartition('@')
+
+    # skip the colons of IP-literals
+    colon = hostport.find(':', hostport.rfind(']') + 1)
+    if colon == -1:
+        host, port = hostport, ''
+    else:
+        host, port = hostport[:colon], hostport[colon + 1:]
+
+    host = normalize_host(host)
+    if port == DEFAULT_PORTS.get(scheme):
+        port = ''
+    return ''.join((normalize_pct(userinfo), at, host,
+                    ':' if port else '', port))
+
+
+__all__ = ['DEFAULT_PORTS', 'normalize_authority', 'normalize_host',
+           'normalize_pct', 'remove_dot_segments']
@@ -0,0 +1,164 @@
+'''
+Strict `RFC 3986`__ URI-reference scanner.
+
+The characters and percent-encoding of the whole string are checked at
+once. Then components are split at their delimiters (as the regex of
+Appendix B does), and only the characters that are delimiters or that
+are restricted to some components are checked: the scheme, the authority
+(userinfo, IP-literals, host and port) and brackets elsewhere.
+
+    >>> scan('http://example.com:80/a?b#c')
+    (0, 4, 7, 21, 21, 23, 24, 25, 26, 27)
+
+__ https://tools.ietf.org/html/rfc3986
+'''
+from typing import Tuple
+from ipaddress import IPv6Address
+
+from ...exceptions import FormatError
+
+#: `(start, end)` offsets of the scheme, authority, path, query and
+#: fragment, flattened. Undefined components are `(-1, -1)`.
+Spans = Tuple[int, int, int, int, int, int, int, int, int, int]
+
+ALPHA      = frozenset('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ')
+DIGIT      = frozenset('0123456789')
+HEXDIG     = DIGIT | frozenset('abcdefABCDEF')
+UNRESERVED = ALPHA | DIGIT | frozenset('-._~')
+SUB_DELIMS = frozenset("!$&'()*+,;=")
+
+SCHEME     = ALPHA | DIGIT | frozenset('+-.')
+USERINFO   = UNRESERVED | SUB_DELIMS | frozenset('%:')
+REG_NAME   = UNRESERVED | SUB_DELIMS | frozenset('%')
+IPVFUTURE  = UNRESERVED | SUB_DELIMS | frozenset(':')
+PCHAR      = UNRESERVED | SUB_DELIMS | frozenset('%:@')
+
+#: characters of any component
+URI_CHARS  = PCHAR | frozenset('/?#[]')
+
+
+def _check_pct(string: str, start: int, end: int) -> None:
+    i = string.find('%', start, end)
+    while i != -1:
+        if (i + 2 >= end
+                or string[i + 1] not in HEXDIG
+                or string[i + 2] not in HEXDIG):
+            raise FormatError(string, 'invalid percent-encoding')
+        i = string.find('%', i + 3, end)
+
+
+def _check_ip_literal(string: str, start: int, end: int) -> None:
+    if string[start] in 'vV':
+        dot = string.find('.', start, end)
+        if (dot < start + 2 or dot == end - 1
+                or not HEXDIG.issuperset(string[start + 1:dot])
+                or not IPVFUTURE.issuperset(string[dot + 1:end])):
+            raise FormatError(string, 'invalid IPvFuture')
+        return
+
+    # zone identifiers (RFC 6874) aren't part of RFC 3986
+    if string.find('%', start, end) != -1:
+        raise FormatError(string, 'invalid IPv6 address')
+    try:
+        IPv6Address(string[start:end])
+    except ValueError:
+        raise FormatError(string, 'invalid IPv6 address') from None
+
+
+def _check_authority(string: str, start: int, end: int) -> None:
+    at = string.find('@', start, end)
+    if at != -1:
+        if not USERINFO.issuperset(string[start:at]):
+            raise FormatError(string, 'invalid userinfo')
+        start = at + 1
+
+    if start < end and string[start] == '[':
+        close = string.find(']', start, end)
+        if close == -1:
+            raise FormatError(string, 'invalid IP-literal')
+        _check_ip_literal(string, start + 1, close)
+        port = close + 1
+        if port < end and string[port] != ':':
+            raise FormatError(string, 'invalid IP-literal')
+    else:
+        port = string.find(':', start, end)
+        if port == -1:
+            port = end
+        if not REG_NAME.issuperset(string[start:port]):
+            raise FormatError(string, 'invalid host')
+
+    if port + 1 < end and not string[port + 1:end].isdigit():
+        raise FormatError(string, 'invalid port')
+
+
+def _scheme(string: str, end: int) -> Tuple[Tuple[int, int], int]:
+    '''Returns the span of the scheme of the string (up to the query),
+    and where the hier-part starts.
+    '''
+    colon = string.find(':', 0, end)
+    if (colon > 0 and string[0] in ALPHA
+            and SCHEME.issuperset(string[1:colon])):
+        return (0, colon), colon + 1
+    if colon != -1 and string.find('/', 0, colon) == -1:
+        # relative references can't have colons in the first segment
+        raise FormatError(string, 'invalid scheme')
+    return (-1, -1), 0
+
+
+def _authority(
+    string: str,
+    start:  int,
+    end:    int,
+) -> Tuple[Tuple[int, int], int]:
+    '''Returns the span of the authority of the hier-part at `start`,
+    and where the path starts.
+    '''
+    if not string.startswith('//', start):
+        return (-1, -1), start
+    path = string.find('/', start + 2, end)
+    if path == -1:
+        path = end
+    _check_authority(string, start + 2, path)
+    return (start + 2, path), path
+
+
+def scan(string: str) -> Spans:
+    '''Returns the spans of the components of a URI-reference, or raises
+    `FormatError`.
+    '''
+    end = len(string)
+    if not URI_CHARS.issuperset(string):
+        raise FormatError(string, 'invalid character')
+    if '%' in string:
+        _check_pct(string, 0, end)
+
+    # fragment
+    hash = string.find('#')
+    if hash == -1:
+        fragment = (-1, -1)
+        hash = end
+    elif string.find('#', hash + 1) != -1:
+        raise FormatError(string, 'invalid fragment')
+    else:
+        fragment = (hash + 1, end)
+
+    # query
+    mark = string.find('?', 0, hash)
+    if mark == -1:
+        query = (-1, -1)
+        mark = hash
+    else:
+        query = (mark + 1, hash)
+
+    scheme, i = _scheme(string, mark)
+    authority, i = _authority(string, i, mark)
+
+    # brackets are only allowed in IP-literals
+    if (('[' in string or ']' in string)
+            and (string.find('[', i) != -1 or string.find(']', i) != -1)):
+        raise FormatError(string, 'invalid character')
+
+    return scheme + authority + (i, mark) + query + fragment
+
+
+__all__ = ['Spans', 'scan']
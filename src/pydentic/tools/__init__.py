@@ -1,7 +1,20 @@
-from .db import Etld
+from typing import Optional
 
+from .db import Etld, Source
+from .suffix import PublicSuffixIndex, load_index
 
-def update_etld_data():
+
+def update_etld_data(source: Optional[Source] = None) -> None:
+    '''Updates the Public Suffix List from its URL, or from a local file
+    or stream.
+    '''
     db = Etld()
-    db.create_tables()
-    db.populate()
+    db.refresh(source)
+    db.write_snapshot()
+
+
+def update_stdnum_manifest():
+    from ..strings.registry import write_manifest
+    from ..strings.detection import write_index
+    write_manifest()
+    write_index()
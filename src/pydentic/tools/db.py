@@ -1,18 +1,63 @@
 from urllib.request import urlopen
-from typing import Optional, Iterator, Tuple, List
+from typing import (IO, TYPE_CHECKING, NamedTuple, Optional, Iterator, Tuple,
+                    Union)
 from pathlib import Path
 import logging
 import sqlite3
 
+if TYPE_CHECKING:  # pragma: no cover
+    from .suffix import PublicSuffixIndex
+
 log = logging.getLogger(__name__)
 
 DATADIR = Path(__file__).parents[1].joinpath('data')
 DATADIR.mkdir(exist_ok=True)
 
+DBPATH = DATADIR / 'db.sqlite'
+
+ETLD_SNAPSHOT = DATADIR / 'etld.bin'
+
+
+#: a URL, a local file, or a text or binary stream
+Source = Union[str, Path, IO]
+
+
+class Diff(NamedTuple):
+    inserted: int
+    deleted:  int
+
+
+def _lines(stream: IO, encoding: Optional[str] = None) -> Iterator[str]:
+    for line in stream:
+        if isinstance(line, bytes):
+            line = line.decode(encoding or 'utf-8')
+        yield line.rstrip('\r\n')
+
 
 class Db:
-    def __init__(self) -> None:
-        self.conn = sqlite3.connect(DATADIR / 'db.sqlite')
+    '''A database of tables populated from a source.
+
+    The `version` of a database is increased by every change of its
+    rows, so data derived from them (e.g. snapshots) can tell whether
+    it's stale. Opened `readonly`, a missing database isn't created.
+    '''
+    def __init__(self, path: Path = DBPATH, readonly: bool = False) -> None:
+        if readonly:
+            path = Path(path)
+            if not path.exists():
+                raise FileNotFoundError(f'no database at {path}')
+            self.conn = sqlite3.connect(f'{path.resolve().as_uri()}?mode=ro',
+                                        uri=True)
+        else:
+            self.conn = sqlite3.connect(path)
+
+    @property
+    def version(self) -> int:
+        return self.conn.execute('pragma user_version;').fetchone()[0]
+
+    def _bump_version(self) -> None:
+        # in the transaction of the change (the version isn't a parameter)
+        self.conn.execute(f'pragma user_version = {self.version + 1:d};')
 
     def create_tables(self) -> None:
         log.debug('Creating %s tables...', self.__class__.__name__)
@@ -21,39 +66,65 @@ def create_tables(self) -> None:
 
     def get_source(
         self,
-        url:      str,
+        source:   Source,
         encoding: Optional[str] = None,
     ) -> Iterator[str]:
-
-        with urlopen(url) as resp:
-            ctype = resp.headers.get_content_type()
-            if ctype == 'text/plain':
+        '''Yields the lines of the source lazily.
+        '''
+        if hasattr(source, 'read'):
+            yield from _lines(source, encoding)
+        elif str(source).startswith(('http://', 'https://')):
+            with urlopen(str(source)) as resp:
                 if encoding is None:
                     encoding = resp.headers.get_content_charset()
-                data = resp.read().decode(encoding or 'utf-8')
-                return iter(data.splitlines())
-            else:
-                return resp.read()
+                yield from _lines(resp, encoding)
+        else:
+            with open(source, 'rb') as fp:
+                yield from _lines(fp, encoding)
 
-    def populate(self) -> None:
+    def populate(self, source: Optional[Source] = None) -> None:
         log.debug('Populating %s tables...', self.__class__.__name__)
-        recs = self.parse_source()
+        recs = self.parse_source(source)
         self.conn.executemany(self._insert_item, recs)
+        self._bump_version()
         self.conn.commit()
 
+    def refresh(self, source: Optional[Source] = None) -> Diff:
+        '''Updates the tables with the changes of the source in a single
+        transaction, so readers see either the old or the new rows.
+
+        The source rows are streamed into a temporary table and diffed
+        against the current ones by sqlite. In WAL mode, readers aren't
+        blocked meanwhile.
+        '''
+        log.debug('Refreshing %s tables...', self.__class__.__name__)
+        conn = self.conn
+        conn.execute('pragma journal_mode=wal;')
+        conn.executescript(self._create_tables)
+        conn.executescript(self._create_staging)
+        with conn:
+            conn.executemany(self._insert_staging, self.parse_source(source))
+            deleted = conn.execute(self._delete_stale).rowcount
+            inserted = conn.execute(self._insert_new).rowcount
+            conn.execute(self._clear_staging)
+            if inserted or deleted:
+                self._bump_version()
+        log.debug('%d rows inserted, %d deleted', inserted, deleted)
+        return Diff(inserted, deleted)
+
 
 ETLD_URL = 'https://raw.githubusercontent.com/publicsuffix/list/master/public_suffix_list.dat'
 
 
 class Etld(Db):
     _create_tables = '''\
-        create table etld (
+        create table if not exists etld (
             id         integer primary key autoincrement,
             tld        text not null collate nocase,
             etld       text not null collate nocase,
             registrar  text
         );
-        create unique index etld_un on etld (
+        create unique index if not exists etld_un on etld (
             tld, etld
         );
     '''
@@ -62,9 +133,38 @@ class Etld(Db):
 
     _insert_item = 'insert into etld (tld, etld, registrar) values (?, ?, ?);'
 
-    def parse_source(self) -> List[Tuple[str, str, str]]:
-        recs = list()
-        data = self.get_source(ETLD_URL)
+    _create_staging = '''\
+        create temp table if not exists etld_new (
+            tld        text not null collate nocase,
+            etld       text not null collate nocase,
+            registrar  text
+        );
+    '''
+
+    _insert_staging = 'insert into etld_new values (?, ?, ?);'
+
+    _delete_stale = '''\
+        delete from etld where not exists (
+            select 1 from etld_new n
+            where n.tld = etld.tld and n.etld = etld.etld
+              and n.registrar is etld.registrar
+        );
+    '''
+
+    _insert_new = '''\
+        insert into etld (tld, etld, registrar)
+        select tld, etld, registrar from etld_new n where not exists (
+            select 1 from etld e where e.tld = n.tld and e.etld = n.etld
+        );
+    '''
+
+    _clear_staging = 'delete from etld_new;'
+
+    def parse_source(
+        self,
+        source: Optional[Source] = None,
+    ) -> Iterator[Tuple[str, str, str]]:
+        data = self.get_source(ETLD_URL if source is None else source)
 
         for line in data:
             if '===BEGIN ICANN DOMAINS===' in line:
@@ -87,6 +187,31 @@ def parse_source(self) -> List[Tuple[str, str, str]]:
                 if line.startswith('//'):
                     continue
                 tld = line.split('.')[-1]
-                recs.append((tld, line, registrar))
-
-        return sorted(recs)
+                yield tld, line, registrar
+
+    def is_empty(self) -> bool:
+        try:
+            row = self.conn.execute('select 1 from etld limit 1;').fetchone()
+        except sqlite3.OperationalError:  # no table
+            return True
+        return row is None
+
+    def rules(self) -> Iterator[str]:
+        for etld, in self.conn.execute('select etld from etld;'):
+            yield etld
+
+    def write_snapshot(self, path: Path = ETLD_SNAPSHOT) -> None:
+        '''Writes the memory-mappable snapshot of the rules (see
+        `suffix.load_index`), stamped with the version of the database.
+        '''
+        from .suffix import SuffixSnapshot
+        log.debug('Writing %s snapshot...', self.__class__.__name__)
+        # read before the rules: a refresh in between makes it stale
+        version = self.version
+        SuffixSnapshot.write(path, self.rules(), version)
+
+    def index(self) -> 'PublicSuffixIndex':
+        '''Returns a lookup index of the stored rules.
+        '''
+        from .suffix import PublicSuffixIndex
+        return PublicSuffixIndex.from_db(self)
@@ -0,0 +1,345 @@
+'''
+Public Suffix List lookups.
+
+    index = PublicSuffixIndex.from_db()
+    index.public_suffix('www.example.co.uk')
+    #> 'co.uk'
+    index.registrable_domain('www.example.co.uk')
+    #> 'example.co.uk'
+
+Rules are stored in a trie of reversed labels (`uk` -> `co` -> ...), so
+lookups walk the labels of the host once. Wildcard (`*.ck`) and
+exception (`!www.ck`) rules follow https://publicsuffix.org/list/.
+
+`update_etld_data` also writes a snapshot of the rules: a checksummed,
+sorted array of rule hashes that `SuffixSnapshot` memory-maps, so forked
+workers share a single copy without parsing anything.
+
+    index = load_index()  # the snapshot, or the database if it's stale
+
+Snapshots are stamped with the version of the database they were written
+from, that every change of its rules increases: modification times
+can't tell, as a refresh in WAL mode only changes `db.sqlite-wal`.
+'''
+from typing import (Any, Dict, Iterable, Iterator, List, NamedTuple,
+                    Optional, Union)
+from abc import ABC, abstractmethod
+from hashlib import blake2b
+from bisect import bisect_left
+from pathlib import Path
+from array import array
+from zlib import crc32
+import logging
+import struct
+import mmap
+import sys
+import os
+
+from ..core.utils import is_ascii
+
+log = logging.getLogger(__name__)
+
+#: key of the rule kind in a trie node (labels are never empty)
+KIND = ''
+
+RULE      = 1
+EXCEPTION = 2
+
+WILDCARD = '*'
+
+Node = Dict[str, Any]
+
+
+class Domain(NamedTuple):
+    host:   str
+    suffix: Optional[str]
+    domain: Optional[str]
+
+
+def _labels(host: str) -> Optional[List[str]]:
+    '''Returns the lowercased labels of the host, or `None` if it's not
+    a domain name.
+    '''
+    labels = host.lower().rstrip('.').split('.')
+    if not all(labels):
+        return None
+    return labels
+
+
+def _forms(rule: str) -> Iterator[str]:
+    '''Yields the rule as is, and its ASCII (punycode) form if it has
+    internationalized labels.
+    '''
+    yield rule
+    if not is_ascii(rule):
+        try:
+            yield '.'.join(label if is_ascii(label) or label == WILDCARD
+                           else label.encode('idna').decode('ascii')
+                           for label in rule.split('.'))
+        except UnicodeError:
+            pass
+
+
+class SuffixLookup(ABC):
+    '''Public suffix lookups of a set of rules.
+    '''
+    @abstractmethod
+    def _suffix_length(self, labels: List[str]) -> int:
+        '''Returns the number of labels of the public suffix of the
+        host, by the prevailing rule: an exception, or else the longest
+        matching rule, or else `*`.
+        '''
+
+    def public_suffix(self, host: str) -> Optional[str]:
+        labels = _labels(host)
+        if labels is None:
+            return None
+        return '.'.join(labels[-self._suffix_length(labels):])
+
+    def registrable_domain(self, host: str) -> Optional[str]:
+        '''Returns the public suffix plus one label, or `None` if the host
+        is a public suffix.
+        '''
+        labels = _labels(host)
+        if labels is None:
+            return None
+        length = self._suffix_length(labels) + 1
+        if len(labels) < length:
+            return None
+        return '.'.join(labels[-length:])
+
+    def lookup(self, host: str) -> Domain:
+        labels = _labels(host)
+        if labels is None:
+            return Domain(host, None, None)
+        length = self._suffix_length(labels)
+        suffix = '.'.join(labels[-length:])
+        domain = ('.'.join(labels[-length - 1:])
+                  if len(labels) > length else None)
+        return Domain(host, suffix, domain)
+
+    def classify(
+        self,
+        hosts:   Iterable[str],
+        maxsize: int = 100_000,
+    ) -> Iterator[Domain]:
+        '''Looks up many hosts (e.g. from access logs). Results of
+        repeated hosts are reused, up to `maxsize` distinct hosts.
+        '''
+        seen = dict()  # type: Dict[str, Domain]
+        lookup = self.lookup
+        for host in hosts:
+            result = seen.get(host)
+            if result is None:
+                if len(seen) >= maxsize:
+                    seen.clear()
+                seen[host] = result = lookup(host)
+            yield result
+
+
+class PublicSuffixIndex(SuffixLookup):
+    '''Trie of Public Suffix List rules.
+    '''
+    def __init__(self, rules: Iterable[str] = ()) -> None:
+        self._root = dict()  # type: Node
+        for rule in rules:
+            self.add(rule)
+
+    @classmethod
+    def from_file(cls, path: Union[str, Path]) -> 'PublicSuffixIndex':
+        '''Builds the index from a `public_suffix_list.dat` file.
+        '''
+        with open(path, encoding='utf-8') as fp:
+            return cls(parse_rules(fp))
+
+    @classmethod
+    def from_db(cls, db: Optional[Any] = None) -> 'PublicSuffixIndex':
+        '''Builds the index from the rows of an `Etld` database (by
+        default, the existing one, opened read-only).
+        '''
+        if db is None:
+            from .db import Etld
+            db = Etld(readonly=True)
+        if db.is_empty():
+            raise LookupError('no public suffix rules, see update_etld_data')
+        return cls(db.rules())
+
+    def add(self, rule: str) -> None:
+        kind = RULE
+        if rule.startswith('!'):
+            kind = EXCEPTION
+            rule = rule[1:]
+
+        for form in _forms(rule):
+            labels = _labels(form)
+            if labels is None:
+                continue
+            node = self._root
+            for label in reversed(labels):
+                node = node.setdefault(label, dict())
+            node[KIND] = kind
+
+    def _suffix_length(self, labels: List[str]) -> int:
+        length = 1
+        nodes = [self._root]
+        for depth, label in enumerate(reversed(labels), 1):
+            matches = []
+            for node in nodes:
+                for key in (label, WILDCARD):
+                    child = node.get(key)
+                    if child is None:
+                        continue
+                    kind = child.get(KIND)
+                    if kind == EXCEPTION:
+                        return depth - 1
+                    if kind == RULE:
+                        length = depth
+                    matches.append(child)
+            if not matches:
+                break
+            nodes = matches
+        return length
+
+
+def parse_rules(lines: Iterable[str]) -> Iterator[str]:
+    '''Yields the rules of the lines of a `public_suffix_list.dat` file.
+    '''
+    for line in lines:
+        line = line.strip()
+        if line and not line.startswith('//'):
+            yield line.split()[0]
+
+
+# snapshots
+
+SNAPSHOT_MAGIC = b'PSL\0'
+
+SNAPSHOT_VERSION = 2
+
+#: magic, version, number of hashes, CRC-32 of the hashes, version of the
+#: database
+HEADER = struct.Struct('<4sHxxIIQ')
+
+
+def _hash(key: str) -> int:
+    digest = blake2b(key.encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'little')
+
+
+def _keys(rule: str) -> Iterator[str]:
+    '''Yields the normalized rule (`!` exceptions and `*.` wildcards
+    included), in all its forms.
+    '''
+    prefix = '!' if rule.startswith('!') else ''
+    for form in _forms(rule[len(prefix):]):
+        labels = _labels(form)
+        if labels is not None:
+            yield prefix + '.'.join(labels)
+
+
+class SuffixSnapshot(SuffixLookup):
+    '''Public suffix rules in a (memory-mapped) buffer: a header and the
+    sorted 64-bit hashes of the rules, little-endian.
+    '''
+    def __init__(self, buffer: Union[bytes, mmap.mmap]) -> None:
+        if len(buffer) < HEADER.size:
+            raise ValueError('truncated snapshot')
+        magic, version, count, checksum, db_version = \
+            HEADER.unpack_from(buffer)
+        if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+            raise ValueError('unsupported snapshot version')
+        if sys.byteorder != 'little':
+            raise ValueError('unsupported byte order')
+
+        data = memoryview(buffer)[HEADER.size:]
+        if len(data) != count * 8 or crc32(data) != checksum:
+            raise ValueError('corrupt snapshot')
+
+        self.db_version = db_version
+        self._buffer    = buffer
+        self._hashes    = data.cast('Q')
+
+    @classmethod
+    def open(cls, path: Union[str, Path]) -> 'SuffixSnapshot':
+        with open(path, 'rb') as fp:
+            buffer = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(buffer)
+
+    @staticmethod
+    def write(
+        path:       Union[str, Path],
+        rules:      Iterable[str],
+        db_version: int = 0,
+    ) -> None:
+        '''Writes the snapshot of the rules (atomically), and the version
+        of the database they come from.
+        '''
+        path = Path(path)
+        hashes = array('Q', sorted({_hash(key)
+                                    for rule in rules
+                                    for key in _keys(rule)}))
+        if sys.byteorder != 'little':
+            hashes.byteswap()
+        data = hashes.tobytes()
+
+        tmp = path.with_name(path.name + '.tmp')
+        with open(tmp, 'wb') as fp:
+            fp.write(HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION,
+                                 len(hashes), crc32(data), db_version))
+            fp.write(data)
+        os.replace(tmp, path)
+
+    def _has(self, key: str) -> bool:
+        value = _hash(key)
+        hashes = self._hashes
+        i = bisect_left(hashes, value)
+        return i < len(hashes) and hashes[i] == value
+
+    def _suffix_length(self, labels: List[str]) -> int:
+        length = 1
+        count = len(labels)
+        for depth in range(1, count + 1):
+            suffix = '.'.join(labels[count - depth:])
+            if self._has('!' + suffix):
+                return depth - 1
+            if self._has(suffix) or depth > 1 and self._has(
+                    '*.' + suffix.partition('.')[2]):
+                length = depth
+        return length
+
+
+def load_index(
+    snapshot: Optional[Union[str, Path]] = None,
+    database: Optional[Union[str, Path]] = None,
+) -> SuffixLookup:
+    '''Returns the snapshot of the rules, or an index of the `Etld`
+    database if the snapshot is missing, stale or corrupt.
+
+    Without a database (or rules in it), the snapshot is used as is; a
+    missing database isn't created.
+    '''
+    from .db import DBPATH, ETLD_SNAPSHOT, Etld
+
+    path = Path(snapshot or ETLD_SNAPSHOT)
+    db = None  # type: Optional[Etld]
+    try:
+        db = Etld(Path(database or DBPATH), readonly=True)
+    except FileNotFoundError:
+        pass
+    if db is not None and db.is_empty():
+        db = None
+
+    try:
+        index = SuffixSnapshot.open(path)
+        if db is not None and index.db_version != db.version:
+            raise ValueError('stale snapshot')
+        return index
+    except (OSError, ValueError) as e:
+        log.debug('Public suffix snapshot not loaded (%s)', e)
+    if db is None:
+        raise LookupError('no public suffix rules, see update_etld_data')
+    return PublicSuffixIndex.from_db(db)
+
+
+__all__ = ['Domain', 'PublicSuffixIndex', 'SuffixLookup', 'SuffixSnapshot',
+           'load_index', 'parse_rules']
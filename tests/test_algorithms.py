@@ -0,0 +1,73 @@
+import logging
+import random
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+log = logging.getLogger(__name__)
+
+
+def numbers(count, length, seed=0):
+    rnd = random.Random(seed)
+    return [''.join(rnd.choice('0123456789') for _ in range(length))
+            for _ in range(count)]
+
+
+def test_checksums():
+    from stdnum import damm, luhn, verhoeff
+    from stdnum.iso7064 import mod_97_10
+
+    from pydentic import algorithms as alg
+
+    for length in (1, 8, 15):
+        nums = numbers(200, length)
+        values = alg.to_array(nums)
+        for vector, scalar in ((alg.luhn_checksum, luhn.checksum),
+                               (alg.verhoeff_checksum, verhoeff.checksum),
+                               (alg.damm_checksum, damm.checksum),
+                               (alg.mod_97_10_checksum, mod_97_10.checksum)):
+            assert vector(values).tolist() == list(map(scalar, nums))
+
+        for vector, scalar in (
+            (alg.luhn_calc_check_digit, luhn.calc_check_digit),
+            (alg.verhoeff_calc_check_digit, verhoeff.calc_check_digit),
+            (alg.damm_calc_check_digit, damm.calc_check_digit),
+        ):
+            assert list(map(str, vector(values))) == list(map(scalar, nums))
+
+    nums = ['3214282912345698765432161182', 'ABCD00', 'ZZ9']
+    values = alg.to_array(nums[:1], alg.BASE36)
+    assert alg.mod_97_10_checksum(values).tolist() == [1]
+    for num in nums[1:]:
+        values = alg.to_array([num], alg.BASE36)
+        assert alg.mod_97_10_checksum(values)[0] == mod_97_10.checksum(num)
+    assert (alg.mod_97_10_calc_check_digits(alg.to_array(['1234'])).tolist()
+            == [int(mod_97_10.calc_check_digits('1234'))])
+
+    with pytest.raises(ValueError):
+        alg.to_array(['12', '123'])
+    with pytest.raises(ValueError):
+        alg.to_array(['1a'])
+
+
+def test_validate_many():
+    from pydentic.strings import Iban, Imei
+    from pydentic.strings.ca import Sin
+    from pydentic.strings.in_ import Aadhaar
+
+    rnd = random.Random(0)
+    ibans = ['es1000750080110600658108', 'GB82 WEST 1234 5698 7654 32', 'ES10',
+             'es1000750080110600658108Ñ', '', 'ES11 0075 0080 1106 0065 8108']
+    ibans += [f'ES{rnd.randrange(10**22):022d}' for _ in range(50)]
+
+    for cls, values in ((Iban, ibans),
+                        (Imei, numbers(100, 15) + numbers(10, 14)),
+                        (Sin, numbers(100, 9) + ['046 454 286']),
+                        (Aadhaar, numbers(100, 12) + ['234123412346'])):
+        batch = cls.validate_many(values)
+        checks = [cls.check(v) for v in values]
+        assert batch.valid == [c.ok for c in checks]
+        assert batch.errors == [c.code for c in checks]
+        assert batch.values == [c.value for c in checks]
+        assert any(batch.valid)
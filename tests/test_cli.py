@@ -0,0 +1,63 @@
+import logging
+import json
+
+import pytest
+
+log = logging.getLogger(__name__)
+
+IBANS = ['es1000750080110600658108', 'ES1100750080110600658108', 'ES10']
+
+
+@pytest.mark.parametrize('workers', [0, 2])
+def test_validate_csv(tmp_path, workers):
+    from pydentic.cli import main
+
+    src = tmp_path / 'input.csv'
+    src.write_text(''.join(f'{i},"a, b",{v}\n' for i, v in enumerate(IBANS)))
+    main(['validate', '--type', 'iban', '--column', '3', str(src),
+          '--workers', str(workers), '--chunk-size', '2'])
+
+    valid = (tmp_path / 'input.valid.csv').read_text().splitlines()
+    rejected = (tmp_path / 'input.rejected.csv').read_text().splitlines()
+    assert valid == ['0,"a, b",ES10 0075 0080 1106 0065 8108']
+    assert rejected == ['1,"a, b",ES1100750080110600658108,checksum',
+                        '2,"a, b",ES10,checksum']
+
+
+def test_validate_ndjson(tmp_path):
+    from pydentic.cli import main
+
+    src = tmp_path / 'input.ndjson'
+    src.write_text(''.join(json.dumps({'id': i, 'iban': v}) + '\n'
+                           for i, v in enumerate(IBANS)))
+    main(['validate', '-t', 'IBAN', '-c', 'iban', str(src), '-w', '0'])
+
+    valid = (tmp_path / 'input.valid.ndjson').read_text().splitlines()
+    rejected = (tmp_path / 'input.rejected.ndjson').read_text().splitlines()
+    assert [json.loads(r)['id'] for r in valid] == [0]
+    assert [json.loads(r)['_error'] for r in rejected] == ['checksum'] * 2
+
+
+def test_get_type():
+    from pydentic.cli import get_type
+    from pydentic.strings.es import Nif
+
+    assert get_type('es.nif') is Nif
+    assert get_type('IBAN').__name__ == 'Iban'
+    for name in ('foo', 'stdnum', 'stdnumfinder', 'foo.bar', 'es', 'es.es',
+                 'es.nif.nif'):
+        with pytest.raises(ValueError):
+            get_type(name)
+
+
+def test_invalid_arguments(tmp_path, capsys):
+    from pydentic.cli import main
+
+    path = tmp_path / 'input.csv'
+    path.write_text('ES7921000813610123456789\n', 'utf-8')
+    for args in (['-t', 'foo.bar'], ['-t', 'iban', '--chunk-size', '0'],
+                 ['-t', 'iban', '--workers', '-1']):
+        with pytest.raises(SystemExit) as e:
+            main(['validate', str(path), '-c', '1', *args])
+        assert e.value.code == 2
+    assert 'unknown type' in capsys.readouterr().err
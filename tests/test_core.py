@@ -21,3 +21,225 @@ def test_reraise():
                 raise stdexc('error')
             except Exception as e:
                 reraise(e, 'value')
+
+
+def test_lazy_import():
+    from pathlib import Path
+    import subprocess
+    import sys
+    import os
+
+    import pydentic
+
+    # JSON Schema is read from the manifest
+    code = ('import sys\n'
+            'from pydentic.strings import Iban\n'
+            'from pydentic.strings.ad import Nrt\n'
+            "Iban.validate('ES1000750080110600658108')\n"
+            'Nrt.__modify_schema__({})\n'
+            "print(' '.join(m for m in sys.modules\n"
+            "               if m.startswith('stdnum.')))")
+    env = dict(os.environ, PYTHONPATH=str(Path(pydentic.__file__).parents[1]))
+    out = subprocess.run([sys.executable, '-c', code], env=env, check=True,
+                         capture_output=True, text=True).stdout.split()
+
+    assert 'stdnum.iban' in out
+    assert 'stdnum.ad.nrt' not in out
+    assert 'stdnum.ad' not in out
+    assert 'stdnum.isbn' not in out
+
+
+def test_manifest(tmp_path):
+    import json
+
+    from pydentic.strings import registry
+
+    # built for the installed stdnum, whatever the bundled one is for
+    path = tmp_path / 'stdnum.json'
+    registry.write_manifest(path)
+    formats = registry.load_manifest(path)
+    assert formats is not None
+    discovered = registry.discover()
+    assert formats.keys() == discovered.keys()
+    assert formats['ad'].keys() == registry.discover('ad').keys()
+    assert formats['Iban'] == ['iban', registry.docline('iban')]
+
+    # stale manifests are ignored
+    manifest = json.loads(path.read_text('utf-8'))
+    manifest['stdnum'] = '0.0'
+    stale = tmp_path / 'stdnum.json'
+    stale.write_text(json.dumps(manifest), 'utf-8')
+    assert registry.load_manifest(stale) is None
+    assert registry.load_manifest(tmp_path / 'missing.json') is None
+
+
+def test_cache():
+    from pydentic.core.cache import clear_caches
+    from pydentic.exceptions import ChecksumError
+    from pydentic.strings import Iban
+    from pydentic.strings.uri import WebSocketUri
+
+    cache = Iban.enable_cache(maxsize=2)
+    try:
+        value = Iban.parse('es1000750080110600658108')
+        assert Iban.parse('es1000750080110600658108') is value
+        for _ in range(2):
+            with pytest.raises(ChecksumError) as exc:
+                Iban.parse('ES1100750080110600658108')
+            assert exc.value.args == ('ES1100750080110600658108',)
+        Iban.parse('GB82 WEST 1234 5698 7654 32')
+        assert Iban.cache_info() == (2, 3, 1, 2, 2)
+
+        clear_caches()
+        assert len(cache) == 0
+    finally:
+        Iban.disable_cache()
+    assert Iban.cache_info() is None
+
+    WebSocketUri.enable_cache()
+    try:
+        ws = WebSocketUri.validate('ws://host/path')
+        assert WebSocketUri.validate('ws://host/path') is ws
+        assert ws.port == '80'
+    finally:
+        WebSocketUri.disable_cache()
+
+
+def test_reraise_subclass():
+    from stdnum.exceptions import InvalidChecksum
+
+    from pydentic.exceptions import ChecksumError, PydenticError, reraise
+
+    class Checksum(InvalidChecksum):
+        pass
+
+    for stdexc, pydexc in ((Checksum, ChecksumError),
+                           (UnicodeError, PydenticError)):
+        with pytest.raises(pydexc):
+            try:
+                raise stdexc()
+            except Exception as e:
+                reraise(e, 'value')
+
+    with pytest.raises(KeyError):
+        try:
+            raise KeyError('error')
+        except Exception as e:
+            reraise(e, 'value')
+
+
+def test_instrumentation():
+    from pydentic.core import instrumentation
+    from pydentic.exceptions import PydenticError
+    from pydentic.strings import Iban
+    from pydentic.strings.mime import ContentType
+    from pydentic.strings.uri import WebSocketUri
+
+    exported = []
+    instrumentation.reset()
+    instrumentation.enable(exporter=exported.append, interval=0)
+    try:
+        assert hasattr(Iban.parse, '__wrapped__')
+        Iban.parse('ES7921000813610123456789')
+        with pytest.raises(PydenticError):
+            Iban.parse('ES7921000813610123456780')
+        WebSocketUri('ws://host/path')
+        ContentType.from_str('application/json')
+    finally:
+        instrumentation.disable()
+    assert not hasattr(Iban.parse, '__wrapped__')
+
+    stats = instrumentation.snapshot()
+    iban = stats['pydentic.strings.Iban.parse']
+    assert iban['calls'] == 2
+    assert iban['errors'] == {'checksum': 1}
+    assert sum(iban['histogram'].values()) == 2
+    uri = stats['pydentic.strings.uri.network.WebSocketUri.__new__']
+    assert uri['calls'] == 1
+    assert stats['pydentic.strings.mime.ContentType.from_str']['calls'] == 1
+    assert exported and exported[-1] == stats
+
+    Iban.parse('ES7921000813610123456789')
+    assert instrumentation.snapshot() == stats
+    instrumentation.reset()
+    assert instrumentation.snapshot() == {}
+
+
+def test_parse_params():
+    from pydentic.core.utils import parse_params, parse_params_many
+
+    params = parse_params(r';a=1; B="x;y=\"z\"" ;flag;a=2', whitespace=True)
+    assert params == {'a': '2', 'b': 'x;y="z"', 'flag': None}
+    assert 'flag' in params and 'c' not in params and 5 not in params
+    assert len(params) == 3
+    assert parse_params('a = b ;c= "d" ;e =', whitespace=True) == \
+        {'a': 'b', 'c': 'd', 'e': ''}
+    assert parse_params('a = b') == {'a ': ' b'}
+    assert parse_params('t=udp&x', sep='&') == {'t': 'udp', 'x': None}
+    assert parse_params(' ; ', whitespace=True) is None
+    for string in ('a="b', '=b', 'a="b"c'):
+        with pytest.raises(ValueError):
+            parse_params(string)
+
+    results = parse_params_many(['a=1', None, 'a=1'])
+    assert results[0] is results[2] and results[1] is None
+
+
+def test_pydantic_v2():
+    from pydantic import BaseModel, ValidationError
+    from pydentic.strings import Iban
+    from pydentic.strings.postal_code import CnPostalCode
+    from pydentic.strings.uri import WebSocketUri
+
+    class Model(BaseModel):
+        iban: Iban
+        code: CnPostalCode
+        uri:  WebSocketUri
+
+    model = Model(iban='ES7921000813610123456789', code='100000',
+                  uri='wss://host/path')
+    assert isinstance(model.iban, Iban)
+    assert model.iban == 'ES79 2100 0813 6101 2345 6789'
+    assert model.code.province == '10'
+    assert model.uri.host == 'host'
+    assert Model.model_validate_json(model.model_dump_json()) == model
+
+    with pytest.raises(ValidationError) as e:
+        Model(iban='ES7921000813610123456780', code='10000X',
+              uri='wss://host/path')
+    types = {error['loc'][0]: error['type'] for error in e.value.errors()}
+    assert types == {'iban': 'value_error', 'code': 'string_pattern_mismatch'}
+
+    schema = Model.model_json_schema()['properties']
+    assert schema['iban']['title'] == 'IBAN'
+    assert schema['code']['pattern'] == r'^(\d\d)(\d)(\d)(\d\d)$'
+
+
+def test_pydantic_v2_plain_types():
+    from pydantic import BaseModel, ValidationError
+    from pydentic.strings.mime import Accept, ContentType, MediaType
+    from pydentic.strings.uri import GeoUri, UriUnion, WebSocketUri
+
+    class Model(BaseModel):
+        uri:    UriUnion[GeoUri, WebSocketUri]
+        ctype:  ContentType
+        mtype:  MediaType
+        accept: Accept
+
+    model = Model(uri='geo:48.2010,16.3695', ctype='text/html; charset=utf-8',
+                  mtype='image/png', accept='text/*;q=0.5')
+    assert isinstance(model.uri, GeoUri)
+    assert model.ctype.params == {'charset': 'utf-8'}
+    assert model.accept.ranges[0].q == 0.5
+    assert model.model_dump(mode='json')['ctype'] == 'text/html;charset=utf-8'
+    assert Model.model_validate_json(model.model_dump_json()) == model
+
+    with pytest.raises(ValidationError) as e:
+        Model(uri='http://host', ctype='text', mtype='image/png',
+              accept='*/html')
+    assert {error['loc'][0] for error in e.value.errors()} == {
+        'uri', 'ctype', 'accept'}
+
+    schema = Model.model_json_schema()['properties']
+    assert len(schema['uri']['anyOf']) == 2
+    assert schema['ctype']['type'] == 'string'
@@ -0,0 +1,132 @@
+import logging
+import os
+import pytest
+
+log = logging.getLogger(__name__)
+log.setLevel(logging.INFO)
+
+
+def test_content_type_cache():
+    from pydantic.v1 import BaseModel
+    from pydentic.strings.mime import CACHE, ContentType, MediaType
+
+    CACHE.clear()
+    a = ContentType.from_str('Application/JSON')
+    b = ContentType.from_str('Application/JSON')
+    assert a is b
+    assert CACHE.info().hits == 1
+    assert a.media_type is MediaType.from_str('application/json')
+    assert a.type is ContentType.from_str('application/xml').type
+
+    with pytest.raises(ValueError):
+        ContentType.from_str('nonsense')
+    with pytest.raises(ValueError):
+        ContentType.from_str('nonsense')
+
+    class Model(BaseModel):
+        ctype: ContentType
+        mtype: MediaType
+
+    model = Model(ctype='Application/JSON', mtype='text/plain')
+    assert model.ctype is a
+    assert model.mtype == MediaType('text', 'plain', None)
+
+
+def test_content_type_whitespace():
+    from pydentic.multipart import Part
+    from pydentic.strings.mime import ContentType, MediaType
+
+    html = ContentType.from_str('text/html ; charset=utf-8')
+    assert html.media_type == MediaType('text', 'html', None)
+    assert html.params == {'charset': 'utf-8'}
+    assert ContentType.from_str('text/html;charset=utf-8 ;q=1 ').params \
+        == {'charset': 'utf-8', 'q': '1'}
+    assert ContentType.from_str('application/json ').subtype == 'json'
+    assert MediaType.from_str('application/json; charset=utf-8') == \
+        MediaType('application', 'json', None)
+
+    part = Part({'content-type': 'text/plain ; charset=latin-1'}, b'')
+    assert part.content_type.params == {'charset': 'latin-1'}
+
+
+def test_negotiation():
+    from pydentic.strings.mime import Accept, MediaType, Negotiator
+
+    accept = Accept.from_str('text/html;level=1, text/*;q=0.3,, */*;q=0.1')
+    assert [r.q for r in accept.ranges] == [1.0, 0.3, 0.1]
+    assert accept.ranges[0].params == {'level': '1'}
+    for header in ('text', 'text/html;q=2', '*/html'):
+        with pytest.raises(ValueError):
+            Accept.from_str(header)
+
+    negotiator = Negotiator(['application/json', 'text/html',
+                             'application/ld+json'])
+    html = MediaType('text', 'html', None)
+    ld = MediaType('application', 'ld', 'json')
+    assert negotiator.best_match(None) == negotiator.offers[0]
+    assert negotiator.best_match('text/*') == html
+    assert negotiator.best_match('application/*+json') == ld
+    header = 'text/html;q=0.5, application/*;q=0.4'
+    assert negotiator.best_match(header) == html
+    assert negotiator.best_match('application/json;q=0, application/*') == ld
+    assert negotiator.best_match('image/png') is None
+    assert negotiator.best_match('text/html;level=1') is None
+    for header in ('garbage', 'text/html;q=2'):
+        assert negotiator.best_match(header) == negotiator.offers[0]
+
+
+def test_multipart():
+    import io
+    from pydentic.multipart import MultipartParser
+
+    body = (b'preamble\r\n--xyz\r\n'
+            b'Content-Disposition: form-data; name="field"\r\n\r\n'
+            b'value\r\n--xyz \r\n'
+            b'Content-Disposition: form-data; name="f"; filename="a.json"\r\n'
+            b'Content-Type: application/json\r\n\r\n'
+            b'{"a": "\r\n--xy"}\r\n--xyz\r\n\r\nno headers\r\n--xyz--\r\n')
+    parser = MultipartParser('multipart/form-data; boundary="xyz"',
+                             spool_size=4)
+
+    parts = list(parser.parse(body))
+    expected = [bytes(part.body) for part in parts]
+    assert expected == [b'value', b'{"a": "\r\n--xy"}', b'no headers']
+    assert isinstance(parts[0].body, memoryview)
+    assert (parts[1].name, parts[1].filename) == ('f', 'a.json')
+    assert str(parts[1].content_type) == 'application/json'
+    assert str(parts[2].content_type) == 'text/plain'
+
+    for size in (1, 5, 1000):
+        chunks = [body[i:i + size] for i in range(0, len(body), size)]
+        bodies = [part.body.read() for part in parser.iter_parts(chunks)]
+        assert bodies == expected
+    bodies = [part.body.read() for part in parser.iter_parts(io.BytesIO(body))]
+    assert bodies == expected
+
+    with pytest.raises(ValueError):
+        list(parser.iter_parts([body[:80]]))
+    with pytest.raises(ValueError):
+        MultipartParser('application/json')
+
+
+def test_guess(tmp_path):
+    from pydentic.strings.magic import classify
+    from pydentic.strings.mime import MediaType
+
+    zip_head = b'PK\x03\x04\x14\x00\x00\x00'
+    assert str(MediaType.guess('a.PNG')) == 'image/png'
+    assert str(MediaType.guess('a.tar.gz')) == 'application/gzip'
+    assert str(MediaType.guess(head=b'RIFF\0\0\0\0WEBPVP8')) == 'image/webp'
+    assert str(MediaType.guess('a.docx', zip_head)).endswith('.document')
+    assert str(MediaType.guess('a.txt', zip_head)) == 'application/zip'
+    assert str(MediaType.guess(head='¿qué?'.encode()[:5])) == 'text/plain'
+    assert MediaType.guess('a.unknown', b'\0\1\2') is None
+
+    (tmp_path / 'sub').mkdir()
+    (tmp_path / 'sub' / 'image').write_bytes(b'\x89PNG\r\n\x1a\n' + bytes(99))
+    (tmp_path / 'data.json').write_text('{}')
+    assert {path[len(str(tmp_path)) + 1:]: str(media_type)
+            for path, media_type in classify(tmp_path)} == {
+        'data.json': 'application/json',
+        f'sub{os.sep}image': 'image/png',
+    }
@@ -0,0 +1,55 @@
+import logging
+
+log = logging.getLogger(__name__)
+
+
+def test_stream():
+    from pydentic.stream import validate
+    from pydentic.strings import Iban
+    from pydentic.strings.postal_code import CnPostalCode
+    from pydentic.strings.uri import WebSocketUri
+
+    records = iter([
+        {'iban': 'es1000750080110600658108', 'ws': 'ws://host/path',
+         'zip': '025500'},
+        {'iban': 'ES1100750080110600658108', 'ws': 'ws://host/path'},
+    ])
+    fields = {'iban': Iban, 'ws': WebSocketUri, 'zip': CnPostalCode}
+    results = validate(records, fields)
+
+    first = next(results)
+    assert first.valid
+    assert first.values['iban'] == 'ES10 0075 0080 1106 0065 8108'
+    assert first.values['ws'].port == '80'
+
+    second = next(results)
+    assert not second.valid
+    assert second.errors == {'iban': 'checksum', 'zip': 'missing'}
+    assert list(second.values) == ['ws']
+
+
+def test_stream_tuples():
+    from pydentic.stream import validate
+    from pydentic.strings import Iban
+
+    results = list(validate([('a', 'es1000750080110600658108'), ('b', 'x')],
+                            fields={1: Iban}))
+    assert [r.valid for r in results] == [True, False]
+
+
+def test_stream_cache():
+    from pydentic.stream import validate
+    from pydentic.strings import Iban
+    from pydentic.strings.uri import WebSocketUri
+
+    records = [{'iban': 'es1000750080110600658108', 'ws': 'ws://host/path'}]
+    fields = {'iban': Iban, 'ws': WebSocketUri}
+    Iban.enable_cache()
+    WebSocketUri.enable_cache()
+    try:
+        first, second = validate(records * 2, fields)
+        assert second.values['iban'] is first.values['iban']
+        assert second.values['ws'] is first.values['ws']
+    finally:
+        Iban.disable_cache()
+        WebSocketUri.disable_cache()
@@ -19,3 +19,89 @@ def test_mac():
                 '001122:DDEEFF',      # PostgreSQL format
                 '001.122.DDE.EFF'):
         log.info(Mac(mac))
+
+
+def test_parse():
+    from pydentic.strings import Iban, Bic, Mac, Damm
+
+    for cls, value in ((Iban, 'es1000750080110600658108'),  # format
+                       (Bic, 'AGRIFRPP 882'),               # compact format
+                       (Mac, '00-11-22-DD-EE-FF'),
+                       (Damm, '5724')):                     # no format
+        parsed = cls.parse(value)
+        assert type(parsed) is cls
+        assert parsed == cls.format(cls.validate(value))
+
+
+def test_validate_many():
+    from pydentic.strings import Iban, Isbn
+
+    batch = Iban.validate_many(['es1000750080110600658108',
+                                'es1000750080110600658108Ñ',
+                                'ES1100750080110600658108'])
+    assert batch.values == ['ES10 0075 0080 1106 0065 8108', None, None]
+    assert batch.valid == [True, False, False]
+    assert batch.errors == [None, 'format', 'checksum']
+
+    assert Isbn.validate_many(['97804650']).errors == ['length']
+
+
+def test_check():
+    from pydentic.strings import Iban
+
+    result = Iban.check('es1000750080110600658108')
+    assert result.ok
+    assert result.value == 'ES10 0075 0080 1106 0065 8108'
+
+    result = Iban.check('ES1100750080110600658108')
+    assert (result.ok, result.value, result.code) == (False, None, 'checksum')
+    assert result.message
+
+
+def test_detect():
+    from pydentic.strings import detect, profile
+    from pydentic.strings.detection import detector
+
+    assert detect('978-0-471-11709-4') == ['Ean', 'Gs1_128', 'Isbn']
+    assert 'Mac' in detect('00:11:22:33:44:55')
+    assert 'nl.Btw' in detect('NL004495445B01')
+    assert 'es.Nif' in detect('ES 12345678-Z')
+    assert detect('hello world') == []
+
+    result = profile(['978-0-471-11709-4', 'es1000750080110600658108',
+                      'ES10 0075 0080 1106 0065 8108', 'n/a'])
+    assert result.count == 4
+    assert result.types['Iban'] == 2
+    assert result.types['Isbn'] == 1
+    assert result.undetected == 1
+
+    result = detector().profile(['0-306-40615-2'] * 3 + ['n/a'], maxsize=1)
+    assert result.types['Isbn'] == 3
+    assert result.undetected == 1
+
+    # the index never rejects a valid value (values from elsewhere than
+    # the docstrings of stdnum)
+    for value in ('0-306-40615-2', '4006381333931', 'DE 136 695 976',
+                  'GB82 WEST 1234 5698 7654 32', 'ab:cd:ef:01:23:45',
+                  'NL 0044 9544 5B01', 'FR 40 303 265 045',
+                  '12-3456789', '4111 1111 1111 1111'):
+        assert detect(value) == detect(value, exhaustive=True), value
+
+
+def test_detection_index_version(tmp_path, caplog):
+    import json
+
+    from pydentic.strings.detection import (INDEX, UNCERTAIN, Detector,
+                                            load_index)
+
+    data = json.loads(INDEX.read_text('utf-8'))
+    data['stdnum'] = '0.0'
+    path = tmp_path / 'signatures.json'
+    path.write_text(json.dumps(data), 'utf-8')
+
+    index = load_index(path)
+    assert set(map(tuple, index['Iban'])) == {UNCERTAIN}
+    assert 'update_stdnum_manifest' in caplog.text
+    detector = Detector(index)
+    assert detector.detect('00:11:22:33:44:55') == \
+        detector.detect('00:11:22:33:44:55', exhaustive=True)
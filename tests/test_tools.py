@@ -0,0 +1,136 @@
+import logging
+
+log = logging.getLogger(__name__)
+
+RULES = '''\
+// ===BEGIN ICANN DOMAINS===
+
+// uk
+uk
+co.uk
+
+// ck
+*.ck
+!www.ck
+
+// jp
+jp
+*.kawasaki.jp
+!city.kawasaki.jp
+
+// 中国
+中国
+'''
+
+
+def test_public_suffix_index(tmp_path):
+    from pydentic.tools.suffix import (Domain, PublicSuffixIndex,
+                                       SuffixSnapshot, parse_rules)
+
+    rules = list(parse_rules(RULES.splitlines()))
+    index = PublicSuffixIndex(rules)
+    SuffixSnapshot.write(tmp_path / 'etld.bin', rules)
+    snapshot = SuffixSnapshot.open(tmp_path / 'etld.bin')
+
+    for host, suffix, domain in (
+        ('www.example.co.uk', 'co.uk', 'example.co.uk'),
+        ('Example.CO.UK.', 'co.uk', 'example.co.uk'),
+        ('co.uk', 'co.uk', None),
+        ('example.com', 'com', 'example.com'),
+        ('b.c.test.ck', 'test.ck', 'c.test.ck'),
+        ('www.ck', 'ck', 'www.ck'),
+        ('a.www.ck', 'ck', 'www.ck'),
+        ('a.b.kawasaki.jp', 'b.kawasaki.jp', 'a.b.kawasaki.jp'),
+        ('city.kawasaki.jp', 'kawasaki.jp', 'city.kawasaki.jp'),
+        ('shishi.中国', '中国', 'shishi.中国'),
+        ('shishi.xn--fiqs8s', 'xn--fiqs8s', 'shishi.xn--fiqs8s'),
+        ('a..b', None, None),
+    ):
+        for lookup in (index, snapshot):
+            assert lookup.public_suffix(host) == suffix, host
+            assert lookup.registrable_domain(host) == domain, host
+
+    hosts = ['www.example.co.uk', 'co.uk', 'www.example.co.uk']
+    assert list(index.classify(hosts, maxsize=1)) == [
+        Domain('www.example.co.uk', 'co.uk', 'example.co.uk'),
+        Domain('co.uk', 'co.uk', None),
+        Domain('www.example.co.uk', 'co.uk', 'example.co.uk'),
+    ]
+
+
+def test_suffix_snapshot_checks(tmp_path):
+    import pytest
+
+    from pydentic.tools.suffix import SuffixSnapshot
+
+    path = tmp_path / 'etld.bin'
+    SuffixSnapshot.write(path, ['uk', 'co.uk'])
+    data = bytearray(path.read_bytes())
+
+    with pytest.raises(ValueError):
+        SuffixSnapshot(bytes(data[:-1]))
+    data[4] += 1
+    with pytest.raises(ValueError):
+        SuffixSnapshot(bytes(data))
+
+
+def test_etld_refresh(tmp_path):
+    from io import BytesIO, StringIO
+
+    from pydentic.tools.db import Diff, Etld
+
+    path = tmp_path / 'db.sqlite'
+    db = Etld(path)
+    assert db.refresh(StringIO(RULES)) == Diff(8, 0)
+    assert db.refresh(StringIO(RULES)) == Diff(0, 0)
+
+    source = tmp_path / 'public_suffix_list.dat'
+    source.write_text(RULES.replace('co.uk\n', 'ac.uk\n'), 'utf-8')
+    reader = Etld(path)
+    rules = reader.rules()
+    first = next(rules)
+    # an open read sees the rules before the refresh
+    assert db.refresh(source) == Diff(1, 1)
+    assert {first, *rules} == {'uk', 'co.uk', '*.ck', '!www.ck', 'jp',
+                               '*.kawasaki.jp', '!city.kawasaki.jp', '中国'}
+    assert 'ac.uk' in set(reader.rules())
+
+    rules = RULES.replace('// jp\n', '// Japan\n').encode('utf-8')
+    assert db.refresh(BytesIO(rules)) == Diff(4, 4)
+    assert db.index().registrable_domain('a.b.kawasaki.jp') == \
+        'a.b.kawasaki.jp'
+
+
+def test_load_index(tmp_path):
+    from io import StringIO
+
+    import pytest
+
+    from pydentic.tools.db import Etld
+    from pydentic.tools.suffix import (PublicSuffixIndex, SuffixSnapshot,
+                                       load_index)
+
+    path, snapshot = tmp_path / 'db.sqlite', tmp_path / 'etld.bin'
+    with pytest.raises(LookupError):
+        load_index(snapshot, path)
+    assert not path.exists()
+
+    db = Etld(path)
+    db.refresh(StringIO(RULES))
+    db.write_snapshot(snapshot)
+    index = load_index(snapshot, path)
+    assert isinstance(index, SuffixSnapshot)
+    assert index.db_version == db.version == 1
+
+    # in WAL mode, only db.sqlite-wal changes
+    db.refresh(StringIO(RULES.replace('co.uk\n', 'ac.uk\n')))
+    index = load_index(snapshot, path)
+    assert isinstance(index, PublicSuffixIndex)
+    assert index.public_suffix('example.ac.uk') == 'ac.uk'
+
+    db.write_snapshot(snapshot)
+    assert isinstance(load_index(snapshot, path), SuffixSnapshot)
+    # without a database, the snapshot is used as is
+    assert isinstance(load_index(snapshot, tmp_path / 'none'),
+                      SuffixSnapshot)
+    assert not (tmp_path / 'none').exists()
@@ -45,3 +45,169 @@ def test_websocket():
 
     assert WebSocketUri('ws://host/path?query').secure is False
     assert WebSocketUri('wss://host/path?query').secure is True
+
+
+def test_lazy_components():
+    from pydentic.strings.uri import TurnUri, WebSocketUri
+
+    ws = WebSocketUri('WSS://host/path')
+    assert ws.__dict__ == {}
+    assert ws.port == '443'
+    assert ws.uri.scheme == 'wss'
+    assert set(ws.__dict__) == {'uri', 'host', 'port'}
+
+    with pytest.raises(AttributeError):
+        ws.lat
+
+    assert TurnUri('turn:host?transport=udp').transport == 'udp'
+    with pytest.raises(ValueError):
+        TurnUri('turn:host?transport=udp&other=value')
+
+
+VALID_URIS = (
+    'ftp://ftp.is.co.za/rfc/rfc1808.txt',
+    'http://www.ietf.org/rfc/rfc2396.txt',
+    'ldap://[2001:db8::7]/c=GB?objectClass?one',
+    'mailto:John.Doe@example.com',
+    'news:comp.infosystems.www.servers.unix',
+    'tel:+1-816-555-1212',
+    'telnet://192.0.2.16:80/',
+    'urn:oasis:names:specification:docbook:dtd:xml:4.1.2',
+    'http://user:pass@[v7.fe80::1]:8080/a%20b?q=%C3%B1#frag/?',
+    'HTTP://Example.COM:/',
+    '//example.com/path',
+    './this:that',
+    '../a/b;p?q',
+    '?query#',
+    '',
+)
+
+INVALID_URIS = (
+    'http://exa mple.com/',      # space
+    'http://example.com/%zz',    # percent-encoding
+    'http://example.com/%4',
+    'http://example.com:80a/',   # port
+    'http://[::1/',              # IP-literal
+    'http://[1::2::3]/',
+    'http://[fe80::1%25eth0]/',  # zone identifier
+    'http://a@b@c/',             # userinfo
+    '1http://example.com/',      # scheme
+    ':that/path',                # empty scheme
+    'http://example.com/#a#b',   # fragment
+    'http://example.com/[x]',    # brackets outside IP-literals
+    'http://exämple.com/',       # IRI
+)
+
+
+def test_scanner_engine():
+    from pydentic.exceptions import FormatError
+    from pydentic.strings.uri.base import URI, ParsedUri, set_engine
+
+    try:
+        set_engine('scanner')
+        assert ParsedUri.from_str('HTTP://h/p?q#f') == \
+            ParsedUri('http', 'h', '/p', 'q', 'f')
+
+        for uri in INVALID_URIS:
+            # the regex engine is lenient
+            URI.match(uri).groupdict()
+            with pytest.raises(FormatError):
+                ParsedUri.from_str(uri)
+    finally:
+        set_engine('regex')
+
+
+def test_scanner_differential():
+    import random
+
+    from pydentic.exceptions import FormatError
+    from pydentic.strings.uri.base import URI, ParsedUri
+    from pydentic.strings.uri.scanner import scan
+
+    rnd = random.Random(3986)
+    chars = 'aZ09:/?#[]@%.-+~!$&;=' + 'aA'
+    fuzz = [''.join(rnd.choice(chars) for _ in range(rnd.randrange(12)))
+            for _ in range(20_000)]
+
+    accepted = 0
+    for uri in VALID_URIS + INVALID_URIS + tuple(fuzz):
+        try:
+            scanned = ParsedUri.from_spans(uri, scan(uri))
+        except FormatError:
+            assert uri not in VALID_URIS
+            continue
+        accepted += 1
+        assert scanned == ParsedUri.from_str(uri, URI), uri
+        assert str(scanned).lower() == uri.lower()
+
+    assert accepted > len(VALID_URIS) * 10
+
+
+def test_canonical_key():
+    from pydentic.strings.uri import WebSocketUri
+    from pydentic.strings.uri.base import AnyUri, ParsedUri
+    from pydentic.strings.uri.normalization import (normalize_authority,
+                                                    remove_dot_segments)
+
+    for path, result in (
+        ('/a/b/c/./../../g', '/a/g'),
+        ('mid/content=5/../6', 'mid/6'),
+        ('/../g', '/g'),
+        ('../g', 'g'),
+        ('/a/b/..', '/a/'),
+        ('/a.b/.c', '/a.b/.c'),
+        ('.', ''),
+        ('./a/./b/.', 'a/b/'),
+        ('/..', '/'),
+    ):
+        assert remove_dot_segments(path) == result
+
+    assert normalize_authority('ex%c3%a9.COM:80', 'http') == 'ex%C3%A9.com'
+    assert normalize_authority('U%7e@%41.b:8080', 'http') == 'U~@a.b:8080'
+
+    uri = ParsedUri.from_str(
+        'HTTP://User@Example.COM:80/%7ea/./b/../%2f?%3d#%7E')
+    assert str(uri.normalize()) == 'http://User@example.com/~a/%2F?%3D#~'
+    assert uri.normalize() is uri.normalize()
+
+    assert str(ParsedUri.from_str('https://[::1]:443').normalize()) == \
+        'https://[::1]/'
+    assert str(ParsedUri.from_str('http://[::1]:8080').normalize()) == \
+        'http://[::1]:8080/'
+
+    uris = ['ws://Host:80/a/../b', 'WS://host/b', 'wss://host:443/b']
+    keys = list(WebSocketUri.canonical_keys(uris))
+    assert keys == ['ws://host/b', 'ws://host/b', 'wss://host/b']
+
+    uri = AnyUri('mailto:John.Doe@Example.com')
+    assert uri.canonical_key() == 'mailto:John.Doe@Example.com'
+    assert uri.canonical_key() is uri.canonical_key()
+
+
+def test_scheme_dispatch():
+    from pydantic.v1 import BaseModel, ValidationError
+
+    from pydentic.strings.uri import (AnyUri, AnyUrn, DoiUri, GeoUri,
+                                      StunUri, UriUnion, WebSocketUri)
+
+    for uri, cls in (
+        ('geo:48.2010,16.3695', GeoUri),
+        ('STUN:example.com', StunUri),
+        ('wss://example.com/path', WebSocketUri),
+        ('urn:isbn:0451450523', AnyUrn),
+        ('doi:10.1000/182', DoiUri),
+        ('http://example.com/', AnyUri),
+    ):
+        assert type(AnyUri.parse(uri)) is cls
+
+    with pytest.raises(ValueError):
+        AnyUri.parse('geo:north')
+
+    class Model(BaseModel):
+        uri: UriUnion[GeoUri, StunUri, WebSocketUri, DoiUri, AnyUrn]
+
+    assert type(Model(uri='stuns:example.com').uri) is StunUri
+    assert type(Model(uri='doi:10.1000/182').uri) is DoiUri
+    with pytest.raises(ValidationError):
+        Model(uri='http://example.com/')
+    assert len(Model.schema()['properties']['uri']['anyOf']) == 5